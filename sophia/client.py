@@ -0,0 +1,5 @@
+from sophia import daimon
+
+if __name__ == '__main__':
+	
+	print(daimon.run('main.sph')) # Runs on the daemon started by python -m sophia serve
@@ -2,12 +2,101 @@
 The Harmonia test suite is a tool intended for developers of Sophia implementations.
 The test suite is used to validate the implementation of the language specification.
 Users can use this tool to verify the integrity of their installation.
+Flags given on the command line are passed to each test, e.g. to select a backend.
+The tests share one host, so that the workers are started only once.
+With the daemon flag, the tests run on a daemon that serves a temporary socket
+instead, followed by a program that reads input from the client.
 '''
 
+import io
 import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
 
+from sophia import daimon
 from sophia.datatypes.mathos import real
-from sophia.runtime import runtime
+from sophia.internal import registers
+from sophia.runtime import host
+
+def machine(value):
+	"""
+	Converts the reals in a target to floats for the float flag.
+	"""
+	if isinstance(value, real):
+		return float(value)
+	elif isinstance(value, tuple):
+		return tuple(machine(i) for i in value)
+	elif isinstance(value, dict):
+		return {k: machine(v) for k, v in value.items()}
+	else:
+		return value
+
+class served:
+	"""
+	Client of a daemon with the interface of a host.
+	"""
+	def __init__(
+		self,
+		address: str
+		) -> None:
+
+		self.address = address
+
+	def run(self, address, *flags, root = 'user', source = None, files = None):
+		"""
+		Runs a program on the daemon. Return values arrive as strings.
+		"""
+		return daimon.run(address, *flags, root = root, source = source, endpoint = self.address, files = files)
+
+@contextmanager
+def serve(*flags):
+	"""
+	Serves the tests on a temporary socket, then stops the daemon.
+	"""
+	executor = next((i for i in flags if i in ('threads', 'serial')), 'processes')
+	with tempfile.TemporaryDirectory() as directory:
+		address = os.path.join(directory, 'harmonia.sock')
+		server = subprocess.Popen([sys.executable, '-m', 'sophia', '--socket', address, 'serve', executor, '--workers', str(max(os.cpu_count() or 1, 4))])
+		try:
+			while not os.path.exists(address): # Wait for the daemon to listen
+				if server.poll() is not None:
+					raise RuntimeError('Daemon exited with status {0}'.format(server.returncode))
+				time.sleep(0.05)
+			yield served(address)
+			daimon.stop(address)
+			server.wait()
+		finally:
+			if server.poll() is None:
+				server.kill()
+
+def roundtrip(tests, *flags):
+	"""
+	Runs a program that reads a line of input from the client and prints it.
+	"""
+	stdin, stdout = io.StringIO('Harmonia\n'), io.StringIO()
+	source = "str x: input('Name: ')\nprint('Hello, ' | x)\nreturn x"
+	result = tests.run('roundtrip.sph', *flags, root = 'harmonia', source = source, files = (stdin, stdout, io.StringIO()))
+	return result == 'Harmonia' and stdout.getvalue().startswith('Name: Hello, Harmonia\n')
+
+def distinct(tests, *flags, count = 20):
+	"""
+	Runs distinct programs in the same process, and checks that the register
+	table does not grow with the number of programs.
+	"""
+	widths = []
+	with tempfile.TemporaryDirectory() as directory:
+		for i in range(count):
+			path = 'program{0}.sph'.format(i)
+			with open(os.path.join(directory, path), 'w') as f:
+				f.write('\n'.join('int v{0}_{1}: {1}'.format(i, j) for j in range(20)))
+				f.write('\nint w{0} (int x):\n\n\treturn x + v{0}_2\n\nf: w{0} <- (1)\nreturn *f + v{0}_1 = 4'.format(i))
+			if tests.run(path, *flags, root = directory) is not True:
+				return False
+			widths.append(len(registers.names))
+	return widths[-1] <= widths[0]
 
 if __name__ == '__main__':
 
@@ -38,23 +127,47 @@ if __name__ == '__main__':
 	   23: True,
 	   24: True,
 	   25: True,
-	   26: True
+	   26: True,
+	   27: True,
+	   28: True,
+	   29: True,
+	   30: (real(0), (real(2),), (real(4),))
 	}
 	
+	flags = tuple(i for i in sys.argv[1:] if i != 'daemon')
+	if 'float' in flags:
+		target = {k: machine(v) for k, v in target.items()}
+	if 'daemon' in sys.argv[1:]: # Return values arrive as strings
+		target = {k: v if v is None else str(v) for k, v in target.items()}
+		suite = serve(*flags)
+	else:
+		suite = host(*flags, workers = max(os.cpu_count() or 1, 4)) # Tasks that cannot suspend hold their workers
 	print('', 'Pass', 'Fail', sep = '\t')
 	successes, failures = 0, 0
-	for i, path in enumerate(os.listdir('harmonia')):
-		main = runtime(path, root = 'harmonia')
-		result = main.run()
-		result = True if result == target[i] else False
-		if result:
-			successes = successes + 1
-		else:
-			failures = failures + 1
-		print(i, 'x' if result else '', '' if result else 'x', sep = '\t')
-
-	else:
-		print('',
-			  '{0} / {1} successes'.format(successes, successes + failures),
-			  'Implementation verified!\n' if not failures else '',
-			  sep = '\n')
\ No newline at end of file
+	with suite as tests:
+		for i, path in enumerate(sorted(i for i in os.listdir('harmonia') if i.endswith('.sph'))):
+			result = tests.run(path, *flags, root = 'harmonia')
+			result = True if result == target[i] else False
+			if result:
+				successes = successes + 1
+			else:
+				failures = failures + 1
+			print(i, 'x' if result else '', '' if result else 'x', sep = '\t')
+		if 'daemon' in sys.argv[1:]:
+			result = roundtrip(tests, *flags)
+			if result:
+				successes = successes + 1
+			else:
+				failures = failures + 1
+			print('io', 'x' if result else '', '' if result else 'x', sep = '\t')
+		else: # The register table of a daemon is in another process
+			result = distinct(tests, *flags)
+			if result:
+				successes = successes + 1
+			else:
+				failures = failures + 1
+			print('reg', 'x' if result else '', '' if result else 'x', sep = '\t')
+	print('',
+		  '{0} / {1} successes'.format(successes, successes + failures),
+		  'Implementation verified!\n' if not failures else '',
+		  sep = '\n')
\ No newline at end of file
@@ -0,0 +1,255 @@
+'''
+The Metron benchmark suite is a tool intended for developers of Sophia implementations.
+Each benchmark measures one part of the implementation at increasing sizes of
+input, so that its growth can be read off the cost per unit of input.
+The benchmarks to run are given on the command line; by default, all of them are run.
+'''
+
+import gc
+import os
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter, sleep
+
+from sophia import daimon, hemera, kadmos, kairos
+from sophia.runtime import host, runtime
+
+def module(blocks):
+	"""
+	Generates a module with 5 lines per block, using nested brackets,
+	comments, aliases and lines that continue onto the next.
+	"""
+	lines = []
+	for i in range(blocks):
+		lines.append("int a{0}: {0} + [{0}, ({0} * 2), ['x': 'y(']][0] // block {0}".format(i))
+		lines.append('if a{0} > 3:'.format(i))
+		lines.append("\ta{0}: [a{0},".format(i))
+		lines.append("\t\t(1 + (2 * (3 - a{0})))][1]".format(i))
+		lines.append('\tstr s{0}: "(not a comment"'.format(i))
+	lines.append('return a0')
+	return '\n'.join(lines)
+
+def nested(depth):
+	"""
+	Generates a module of blocks nested to the given depth, each of
+	which dedents back to the top level.
+	"""
+	lines = []
+	for i in range(4):
+		for level in range(depth):
+			lines.append('\t' * level + 'if a > {0}:'.format(level))
+		lines.append('\t' * depth + 'a: a + 1')
+	lines.append('return a')
+	return 'int a: 0\n' + '\n'.join(lines)
+
+def long(blocks):
+	"""
+	Generates a module with one long block, whose lines each dedent from a
+	nested block to a head at the start of the module.
+	"""
+	lines = ['int a: 0', 'if a = 0:']
+	for i in range(blocks):
+		lines.append('\tif a > {0}:'.format(i))
+		lines.append('\t\ta: a + 1')
+		lines.append('\ta: a - 1')
+	lines.append('return a')
+	return '\n'.join(lines)
+
+def fanout(width, size = 200):
+	"""
+	Generates a module that starts the given number of tasks, each of which
+	sums a range of the given size, and then resolves all of them.
+	"""
+	lines = ['num work (num n):', '', '\tnum s: 0', '\tfor i in [0:n:1]:', '\t\ts: s + i', '\treturn s', '']
+	for i in range(width):
+		lines.append('f{0}: work <- ({1})'.format(i, size))
+	lines.append('return ' + ' + '.join('*f{0}'.format(i) for i in range(width)))
+	return '\n'.join(lines)
+
+def library(size):
+	"""
+	Generates a module with the given number of routines, each with its own
+	constant.
+	"""
+	lines = []
+	for i in range(size):
+		lines.extend(('num f{0} (num x):'.format(i), '', '\treturn x + {0}'.format(i), ''))
+	return '\n'.join(lines)
+
+def caller(calls):
+	"""
+	Generates a module that calls a routine of a used module in a loop.
+	"""
+	return 'use f1 from library\nnum s: 0\nfor i in [1:{0}:1]:\n\ts: f1(s)\nreturn s'.format(calls)
+
+def parse(sizes = (500, 1000, 2000, 4000), repeats = 3):
+	"""
+	Parses modules without the bytecode cache, timing each phase of the
+	parser per line at the fastest of several runs. Lines are scanned as
+	they are tokenised, so the two phases are timed together. The cyclic
+	garbage collector is paused, since its passes grow with the number of
+	live nodes rather than with the work of the parser.
+	"""
+	print('', 'Lines', 'Time (s)', 'Per line (us)', 'Tokenise', 'Generate', sep = '\t')
+	for blocks in sizes:
+		source = module(blocks)
+		times = []
+		for i in range(repeats):
+			parser = kadmos.parser(hemera.handler(source, ()), 'metron')
+			gc.collect()
+			gc.disable()
+			start = perf_counter()
+			tokens = parser.tokenise(parser.scan(source))
+			tokenised = perf_counter()
+			parser.link(tokens)
+			parser.generate()
+			parser.fold()
+			parser.ranges()
+			end = perf_counter()
+			gc.enable()
+			times.append((end - start, tokenised - start, end - tokenised))
+		total, *phases = min(times)
+		print('', blocks * 5, round(total, 3), *(round(i / (blocks * 5) * 1e6, 1) for i in (total, *phases)), sep = '\t')
+
+def fold(sizes = (500, 1000, 2000, 4000)):
+	"""
+	Folds the constant operators of modules, after generating their
+	instructions.
+	"""
+	print('', 'Lines', 'Removed', 'Time (s)', 'Per line (us)', sep = '\t')
+	for blocks in sizes:
+		source = module(blocks)
+		handler = hemera.handler(source, ())
+		parser = kadmos.parser(handler, 'metron')
+		parser.link(parser.tokenise(parser.scan(source)))
+		parser.generate()
+		length = len(parser.instructions)
+		start = perf_counter()
+		parser.fold()
+		total = perf_counter() - start
+		print('', blocks * 5, length - len(parser.instructions), round(total, 3), round(total / (blocks * 5) * 1e6, 1), sep = '\t')
+
+def link(sizes = (500, 1000, 2000, 4000)):
+	"""
+	Links the lines of deeply nested and of long modules into a tree.
+	"""
+	print('', 'Module', 'Lines', 'Time (s)', 'Per line (us)', sep = '\t')
+	for generator in (nested, long):
+		for size in sizes:
+			source = generator(size)
+			parser = kadmos.parser(hemera.handler(source, ()), 'metron')
+			lines = parser.tokenise(parser.scan(source))
+			start = perf_counter()
+			parser.link(lines)
+			total = perf_counter() - start
+			print('', generator.__name__, len(lines), round(total, 3), round(total / len(lines) * 1e6, 2), sep = '\t')
+
+def executors(sizes = (10, 30, 100), workers = 4):
+	"""
+	Runs the concurrent Harmonia tests and fan-out/fan-in modules of
+	increasing width on each executor.
+	"""
+	names = ['processes'] + list(kairos.executors)
+	programs = [('harmonia', i) for i in ('test18.sph', 'test19.sph', 'test21.sph', 'test25.sph', 'test26.sph')]
+	with TemporaryDirectory() as root:
+		for width in sizes:
+			with open(os.path.join(root, 'fanout{0}.sph'.format(width)), 'w') as f:
+				f.write(fanout(width))
+			programs.append((root, 'fanout{0}.sph'.format(width)))
+		print('', 'Program', *names, sep = '\t')
+		for root, address in programs:
+			times = []
+			for name in names:
+				flags = () if name == 'processes' else (name,)
+				start = perf_counter()
+				runtime(address, *flags, root = root, workers = workers).run()
+				times.append(round(perf_counter() - start, 3))
+			print('', address.split('.')[0], *times, sep = '\t')
+
+def calls(sizes = (10, 100, 1000), calls = 2000):
+	"""
+	Calls a routine of a used module of increasing size. The time of a run
+	without calls is subtracted, once the compiled module is cached.
+	"""
+	print('', 'Routines', 'Time (s)', 'Per call (us)', sep = '\t')
+	with TemporaryDirectory() as root:
+		with open(os.path.join(root, 'idle.sph'), 'w') as f:
+			f.write(caller(0))
+		with open(os.path.join(root, 'busy.sph'), 'w') as f:
+			f.write(caller(calls))
+		for size in sizes:
+			with open(os.path.join(root, 'library.sph'), 'w') as f:
+				f.write(library(size))
+			times = []
+			for address in ('idle.sph', 'idle.sph', 'busy.sph'):
+				start = perf_counter()
+				runtime(address, root = root).run()
+				times.append(perf_counter() - start)
+			total = times[2] - times[1]
+			print('', size, round(total, 3), round(total / calls * 1e6, 2), sep = '\t')
+
+def warm(sizes = (10, 20, 40), workers = 4):
+	"""
+	Runs a batch of short Harmonia programs, starting a new pool for each
+	program and on a host that keeps its pool warm.
+	"""
+	programs = ('test02.sph', 'test18.sph', 'test21.sph', 'test26.sph')
+	print('', 'Programs', 'Cold (s)', 'Warm (s)', 'Per program (ms)', sep = '\t')
+	for size in sizes:
+		batch = [programs[i % len(programs)] for i in range(size)]
+		start = perf_counter()
+		for address in batch:
+			runtime(address, root = 'harmonia', workers = workers).run()
+		cold = perf_counter() - start
+		start = perf_counter()
+		with host(workers = workers) as warmed:
+			for address in batch:
+				warmed.run(address, root = 'harmonia')
+		total = perf_counter() - start
+		print('', size, round(cold, 3), round(total, 3), '{0} / {1}'.format(round(cold / size * 1e3, 1), round(total / size * 1e3, 1)), sep = '\t')
+
+def daemon(repeats = 10, workers = 4):
+	"""
+	Invokes short Harmonia programs from new interpreters, running them in
+	the interpreter as run.py does and on a daemon started on a socket in a
+	temporary directory, through the thin client.
+	"""
+	programs = ('test02.sph', 'test18.sph', 'test21.sph', 'test26.sph')
+	with TemporaryDirectory() as directory:
+		socket = os.path.join(directory, 'metron.sock')
+		server = subprocess.Popen([sys.executable, '-m', 'sophia', '--socket', socket, 'serve', '--workers', str(workers)])
+		try:
+			while not os.path.exists(socket):
+				sleep(0.01)
+			print('', 'Program', 'Interpreter (ms)', 'Client (ms)', sep = '\t')
+			for address in programs:
+				interpreter = 'from sophia.runtime import runtime; print(runtime({0!r}, root = "harmonia", workers = {1}).run())'.format(address, workers)
+				start = perf_counter()
+				for _ in range(repeats):
+					subprocess.run([sys.executable, '-c', interpreter], check = True, stdout = subprocess.DEVNULL)
+				cold = perf_counter() - start
+				start = perf_counter()
+				for _ in range(repeats):
+					subprocess.run([sys.executable, '-m', 'sophia', '--socket', socket, 'run', 'harmonia/' + address], check = True, stdout = subprocess.DEVNULL)
+				total = perf_counter() - start
+				print('', address.split('.')[0], round(cold / repeats * 1e3, 2), round(total / repeats * 1e3, 2), sep = '\t')
+		finally:
+			daimon.stop(socket)
+			server.wait()
+
+benchmarks = {
+	'parse': parse,
+	'fold': fold,
+	'link': link,
+	'calls': calls,
+	'executors': executors,
+	'warm': warm,
+	'daemon': daemon
+}
+
+if __name__ == '__main__':
+
+	for name in sys.argv[1:] or benchmarks:
+		print(name)
+		benchmarks[name]()
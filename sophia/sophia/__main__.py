@@ -0,0 +1,34 @@
+'''
+Command line interface for Sophia.
+	python -m sophia [--socket path] serve [processes | threads | serial] [--workers n]
+	python -m sophia [--socket path] run [file] [flags]
+	python -m sophia [--socket path] stop
+The serve command starts the daemon; run and stop are thin clients of it.
+'''
+
+import os
+from argparse import ArgumentParser
+
+from . import daimon
+
+if __name__ == '__main__':
+
+	arguments = ArgumentParser(prog = 'sophia')
+	arguments.add_argument('--socket', default = None)
+	commands = arguments.add_subparsers(dest = 'command', required = True)
+	serve = commands.add_parser('serve')
+	serve.add_argument('executor', nargs = '?', choices = ('processes', 'threads', 'serial'), default = 'processes')
+	serve.add_argument('--workers', type = int, default = None)
+	run = commands.add_parser('run')
+	run.add_argument('file', nargs = '?', default = 'user/main.sph')
+	run.add_argument('flags', nargs = '*')
+	commands.add_parser('stop')
+	options = arguments.parse_args()
+	if options.command == 'serve':
+		executor = () if options.executor == 'processes' else (options.executor,) # Processes are the default
+		daimon.serve(options.socket, *executor, workers = options.workers)
+	elif options.command == 'run':
+		root, address = os.path.split(options.file)
+		print(daimon.run(address, *options.flags, root = root or '.', endpoint = options.socket))
+	else:
+		daimon.stop(options.socket)
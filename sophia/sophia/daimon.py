@@ -0,0 +1,203 @@
+'''
+Daemon mode for Sophia.
+The daemon keeps the interpreter resident: the standard library, the bytecode
+cache and a warm host stay loaded between programs. Clients send programs over
+a Unix domain socket and receive their standard streams and return value.
+The protocol is one JSON object per line. A request names a file to run, or
+gives the source of a program; the daemon answers with frames of output,
+followed by the return value of the program. When the program reads input,
+the daemon sends a frame that asks the client for a line of its own input.
+This module only imports the interpreter when serving, so that the client
+starts quickly.
+'''
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from typing import Any
+
+def default() -> str:
+	"""
+	Gets the address of the daemon's socket.
+	"""
+	return os.environ.get('SOPHIA_SOCKET') or os.path.join(tempfile.gettempdir(), 'sophia-{0}.sock'.format(os.getuid()))
+
+class stream:
+	"""
+	File-like object that forwards writes to the client as frames, and reads
+	lines of input from the client.
+	Frames from concurrent tasks are serialised by the lock of the connection.
+	"""
+	def __init__(
+		self,
+		name: str,
+		connection: Any,
+		lock: threading.Lock,
+		source: Any = None
+		) -> None:
+
+		self.name = name
+		self.connection = connection
+		self.lock = lock
+		self.source = source # Frames sent by the client
+
+	def write(
+		self,
+		text: str
+		) -> int:
+
+		if text:
+			with self.lock:
+				self.connection.write((json.dumps({self.name: text}) + '\n').encode())
+		return len(text)
+
+	def readline(self) -> str:
+		"""
+		Asks the client for a line of input. An empty line is the end of the
+		client's input.
+		"""
+		with self.lock:
+			self.connection.write((json.dumps({self.name: None}) + '\n').encode())
+		line = self.source.readline()
+		return json.loads(line)[self.name] if line else ''
+
+	def flush(self) -> None: pass
+
+class request(socketserver.StreamRequestHandler):
+	"""
+	Runs the program of a request on the host of the daemon.
+	"""
+	def handle(self) -> None:
+
+		from . import hemera
+		line = self.rfile.readline()
+		if not line:
+			return
+		message, lock = json.loads(line), threading.Lock()
+		if message.get('stop'):
+			threading.Thread(target = self.server.shutdown).start()
+			self.wfile.write(b'{"return": null}\n')
+			return
+		stdout, stderr = stream('stdout', self.wfile, lock), stream('stderr', self.wfile, lock)
+		try:
+			with hemera.redirect(stream('stdin', self.wfile, lock, self.rfile), stdout, stderr):
+				value = self.server.host.run(
+					message['address'],
+					*message.get('flags', ()),
+					root = message.get('root', 'user'),
+					source = message.get('source')
+				)
+			reply = {'return': None if value is None else str(value)}
+		except Exception as e: # Reported to the client instead of ending the daemon
+			reply = {'error': '{0}: {1}'.format(type(e).__name__, e)}
+		with lock:
+			self.wfile.write((json.dumps(reply) + '\n').encode())
+
+class daemon(socketserver.UnixStreamServer):
+	"""
+	Sophia server on a Unix domain socket.
+	Programs are run one at a time, since they share the executor of the host.
+	Tasks run on a warm pool of worker processes unless another executor is
+	selected; the workers forward their output to the supervisor, which
+	writes it to the client.
+	"""
+	def __init__(
+		self,
+		address: str,
+		*flags: tuple[str, ...],
+		workers: int | None = None
+		) -> None:
+
+		from .runtime import host
+		if os.path.exists(address): # Remove the socket of a daemon that has exited
+			try:
+				with socket.socket(socket.AF_UNIX) as probe:
+					probe.connect(address)
+			except OSError:
+				os.unlink(address)
+			else:
+				raise OSError('Daemon already running on {0}'.format(address))
+		super().__init__(address, request)
+		self.host = host(*flags, workers = workers, forward = True)
+
+	def server_close(self) -> None:
+
+		super().server_close()
+		self.host.close()
+		if os.path.exists(self.server_address):
+			os.unlink(self.server_address)
+
+def serve(
+	address: str | None = None,
+	*flags: tuple[str, ...],
+	workers: int | None = None
+	) -> None:
+	"""
+	Serves programs until the daemon is stopped.
+	"""
+	with daemon(address or default(), *flags, workers = workers) as server:
+		try:
+			server.serve_forever()
+		except KeyboardInterrupt:
+			pass
+
+def client(
+	message: dict,
+	address: str | None = None,
+	files: tuple[Any, Any, Any] | None = None
+	) -> Any:
+	"""
+	Sends a request to the daemon, writing the output of the program to the
+	standard streams as it arrives and answering its requests for input.
+	Other files may be given in place of the standard streams. Returns the
+	final frame.
+	"""
+	stdin, stdout, stderr = files or (sys.stdin, sys.stdout, sys.stderr)
+	with socket.socket(socket.AF_UNIX) as connection:
+		connection.connect(address or default())
+		connection.sendall((json.dumps(message) + '\n').encode())
+		with connection.makefile('rb') as frames:
+			for line in frames:
+				frame = json.loads(line)
+				if 'stdout' in frame:
+					stdout.write(frame['stdout'])
+				elif 'stderr' in frame:
+					stderr.write(frame['stderr'])
+				elif 'stdin' in frame:
+					stdout.flush()
+					connection.sendall((json.dumps({'stdin': stdin.readline()}) + '\n').encode())
+				else:
+					stdout.flush()
+					return frame
+	raise ConnectionError('Daemon closed the connection')
+
+def run(
+	address: str,
+	*flags: tuple[str, ...],
+	root: str = 'user',
+	source: str | None = None,
+	endpoint: str | None = None,
+	files: tuple[Any, Any, Any] | None = None
+	) -> Any:
+	"""
+	Runs a program on the daemon. The root is resolved by the client, since
+	the daemon can be started from any directory.
+	"""
+	frame = client({
+		'address': address,
+		'flags': flags,
+		'root': os.path.abspath(root),
+		'source': source
+	}, endpoint, files)
+	if 'error' in frame:
+		raise RuntimeError(frame['error'])
+	return frame['return']
+
+def stop(
+	address: str | None = None
+	) -> None:
+
+	client({'stop': True}, address)
@@ -2,10 +2,12 @@ import json
 from functools import reduce
 from sys import stderr
 from typing import Any, Callable, Self
+from weakref import WeakValueDictionary
 
 from .iris import reference, std_stdin
 from .mathos import real, slice
-from ..internal import presets
+from .mnemosyne import record, rope, vector
+from ..internal import presets, registers
 from ..internal.instructions import instruction
 
 with open('sophia/stdlib/kleio.json', 'r') as kleio:
@@ -27,6 +29,11 @@ class type_property:
 		self.check = self.__check__ if name in presets.STDLIB_TYPES else self.__user__
 		self.property = value
 		self.closure = {}
+		self.bound = None # Names of the closure that the property reads
+		if name in presets.STDLIB_TYPES and name not in presets.PROPERTIES: # Built-in properties are bits of a mask
+			self.bit = 1 << presets.STDLIB_TYPES.index(name)
+		else:
+			self.bit = 0
 
 	def __eq__(
 		self,
@@ -35,8 +42,21 @@ class type_property:
 
 		return self.name == other.name and self.property == other.property
 
+	def __hash__(self) -> int:
+		"""
+		User properties are hashed by identity, so that every definition of a
+		user type is interned separately with its own closure.
+		"""
+		if self.bit:
+			return self.bit
+		elif self.name in presets.PROPERTIES:
+			return hash((self.name, self.property))
+		return id(self)
+
 	def __str__(self) -> str: return self.name
 
+	def pending(self) -> bool: return False
+
 	def __user__(
 		self,
 		task,
@@ -44,11 +64,17 @@ class type_property:
 		known: Any # Known type of value
 		) -> bool:
 		
-		caller = task.call()
+		if self.bound is None:
+			self.bound = bind(self.closure, self.property)
+		names, types = self.bound
+		caller = task.call(registers.writes(self.property, self.name, *names))
 		task.final = typedef(known, self) # Extend known type with own property
-		task.values[self.name], task.types[self.name] = value, known
-		task.values = task.values | self.closure
-		task.types = task.types | {k: infer(v) for k, v in self.closure.items()}
+		slot = registers.slot(self.name)
+		registers.extend(task.values, task.types)
+		task.values[slot], task.types[slot] = value, known
+		if names:
+			registers.update(task.values, names)
+			registers.update(task.types, types)
 		task.instructions = self.property
 		task.path = 1
 		value = task.run()
@@ -98,11 +124,11 @@ class type_property:
 
 	def __number__(self, task, value) -> bool:
 
-		return isinstance(value, real)
+		return isinstance(value, (real, float))
 
 	def __integer__(self, task, value) -> bool:
 
-		return value % 1 == 0
+		return value.denominator == 1 if type(value) is real else value.is_integer()
 
 	def __sequence__(self, task, value) -> bool:
 
@@ -110,15 +136,15 @@ class type_property:
 
 	def __string__(self, task, value) -> bool:
 
-		return isinstance(value, str)
+		return isinstance(value, (str, rope))
 
 	def __list__(self, task, value) -> bool:
 
-		return isinstance(value, tuple)
+		return isinstance(value, (tuple, vector))
 
 	def __record__(self, task, value) -> bool:
 
-		return isinstance(value, dict)
+		return isinstance(value, (dict, record))
 
 	def __slice__(self, task, value) -> bool:
 
@@ -130,7 +156,7 @@ class type_property:
 
 	def __element__(self, task, value) -> bool:
 
-		if isinstance(value, dict):
+		if isinstance(value, (dict, record)):
 			return all(self.property(task, i) for i in value.values())
 		else:
 			return all(self.property(task, i) for i in value)
@@ -144,24 +170,57 @@ class typedef:
 	Type descriptor that holds the properties of a given type.
 	I no longer care if a type has 2 of the same property.
 	That's the user's problem.
+	Typedefs are immutable and hash-consed, so that structurally equal
+	types are usually the same object.
 	"""
-	def __init__(
-		self,
+	def __new__(
+		cls,
 		supertype: Self | None = None,
 		*methods: tuple[type_property | type, ...],
 		prototype: Any = None
-		) -> None:
+		) -> Self:
 		
-		if supertype: # Duplicate typedef
-			self.types = supertype.types.copy()
-			self.prototype = supertype.prototype
+		if supertype: # Extend typedef
+			if not methods and (prototype is None or prototype is supertype.prototype):
+				return supertype # Already interned
+			types = supertype.types + list(methods) if methods else supertype.types
+			if prototype is None:
+				prototype = supertype.prototype
 		else:
-			self.types = []
-			self.prototype = None
-		if methods:
-			self.types.extend(methods)
-		if prototype is not None:
+			types = list(methods)
+		return cls.intern(types, prototype)
+
+	@classmethod
+	def intern(
+		cls,
+		types: list[type_property],
+		prototype: Any
+		) -> Self:
+		"""
+		Gets the typedef with the given properties and prototype from the
+		table of interned typedefs, creating it if it does not exist.
+		"""
+		properties = tuple(types)
+		try:
+			self = interned.get(key := (properties, type(prototype), prototype))
+		except TypeError: # Unhashable prototypes are identified by identity
+			self = interned.get(key := (properties, type(prototype), id(prototype)))
+		if self is None:
+			self = super().__new__(cls)
+			self.types = list(types)
 			self.prototype = prototype
+			self.mask = 0 # Built-in properties
+			for item in types:
+				self.mask = self.mask | item.bit
+			self.extra = tuple(item for item in types if not item.bit) # Other properties
+			interned[key] = self
+		return self
+
+	def __reduce__(self) -> tuple:
+		"""
+		Typedefs are interned again when unpickled.
+		"""
+		return type(self).intern, (self.types, self.prototype)
 
 	def __call__(self, task, value, *, write = True):
 		"""
@@ -169,7 +228,7 @@ class typedef:
 		Instead, a custom dispatch is performed based on the known
 		properties of the argument's type.
 		"""
-		address, definition = task.op.address, task.signature[0]
+		address, definition = task.op.slot, task.signature[0]
 		if definition < self: # Value is subtype
 			check = True
 		else:
@@ -206,7 +265,29 @@ class typedef:
 		Type equality.
 		Sophia uses structural typing.
 		"""
-		return self.__dict__ == other.__dict__
+		if self is other:
+			return True
+		return isinstance(other, typedef) and self.types == other.types and self.prototype == other.prototype
+
+	def __hash__(self) -> int:
+
+		return hash(tuple(item.name for item in self.types))
+
+	def matches(
+		self,
+		other: Self
+		) -> bool:
+		"""
+		Property equality for the keys of dispatch caches.
+		Element types that have not been inferred yet only match themselves,
+		so that a cache lookup does not infer them.
+		"""
+		if self.mask != other.mask or len(self.extra) != len(other.extra):
+			return False
+		for x, y in zip(self.extra, other.extra):
+			if x is not y and (x.name != y.name or x.pending() or y.pending() or x.property != y.property):
+				return False
+		return True
 
 	def __lt__(
 		self,
@@ -215,8 +296,12 @@ class typedef:
 		"""
 		Subtype relation.
 		Returns true if self is a strict subtype of other.
+		Built-in properties are compared as a mask, and any other properties
+		are compared directly.
 		"""
-		return not bool([i for i in other.types if i not in self.types])
+		if other.mask & ~self.mask:
+			return False
+		return not other.extra or all(i in self.extra for i in other.extra)
 
 	def __gt__(
 		self,
@@ -226,7 +311,7 @@ class typedef:
 		Negative subtype relation.
 		Returns true if self is not a strict subtype of other.
 		"""
-		return bool([i for i in other.types if i not in self.types])
+		return not self < other
 
 	def __and__(
 		self,
@@ -305,6 +390,44 @@ class typedef:
 			methods.append(properties[name](value))
 		return cls(datatype, *methods) # Create new typedef from base datatype
 
+class lazy_element(type_property):
+	"""
+	Element property of a list or record whose element type is only
+	inferred when a dispatch or check first compares it.
+	"""
+	def __init__(
+		self,
+		sequence: tuple | dict | vector | record
+		) -> None:
+
+		self.name = 'element'
+		self.tag = '__element__'
+		self.check = self.__check__
+		self.closure = {}
+		self.bound = None
+		self.bit = 0
+		self.sequence = sequence
+		self.element = None
+
+	@property
+	def property(self) -> typedef:
+
+		if self.element is None:
+			self.element, self.sequence = infer_element(self.sequence), None
+		return self.element
+
+	def __hash__(self) -> int:
+		"""
+		Hashed by identity to avoid inferring the element type.
+		"""
+		return id(self)
+
+	def pending(self) -> bool: return self.element is None
+
+	def __reduce__(self) -> tuple:
+
+		return cls_element, (self.property,)
+
 class method:
 	"""
 	Implements a method. This functions as the leaf node of a multimethod's
@@ -331,6 +454,7 @@ class method:
 		self.signature = types[1:]
 		self.arity = len(self.signature)
 		self.closure = {}
+		self.bound = None # Names of the closure that the method reads
 	
 	def __call__(
 		self,
@@ -338,17 +462,72 @@ class method:
 		*args: tuple
 		) -> None:
 
-		task.caller = task.call()
+		task.caller = task.call(self.frame())
 		task.final = self.final
-		task.values = task.values | dict(zip(self.params, args)) | self.closure
-		task.types = task.types | dict(zip(self.params, self.signature)) | {k: infer(v) for k, v in self.closure.items()}
-		task.instructions = self.instructions
-		task.path = 1
+		self.enter(task, args)
 
 	def __bool__(self) -> bool: return False
 
 	def __str__(self) -> str: return self.name
 
+	def tail(
+		self,
+		task,
+		*args: tuple
+		) -> None:
+		"""
+		Calls the method in place of the calling routine, whose frame is
+		replaced so that the method returns directly to the caller of the
+		routine. The routine keeps its final type, so the method must return
+		a subtype of it.
+		"""
+		caller = task.caller
+		if caller is None or not (self.final is task.final or self.final < task.final):
+			return self(task, *args)
+		if (frame := caller['frame']) is not None and task.instructions is not self.instructions:
+			if (slots := self.frame()) is None:
+				return self(task, *args)
+			values, types = task.values, task.types
+			registers.extend(values, types)
+			saved = {slot for slot, _, _ in frame} # Registers not written by the routine still hold the values of its caller
+			frame.extend((slot, values[slot], types[slot]) for slot in slots if slot not in saved)
+		self.enter(task, args)
+
+	def enter(
+		self,
+		task,
+		args: tuple
+		) -> None:
+		"""
+		Binds the arguments and closure of the method and enters its body.
+		"""
+		values, types = task.values, task.types
+		slots = [registers.slot(name) for name in self.params]
+		registers.extend(values, types)
+		for i, slot in enumerate(slots):
+			values[slot], types[slot] = args[i], self.signature[i]
+		if self.closure:
+			names, known = self.bindings()
+			registers.update(values, names)
+			registers.update(types, known)
+		task.instructions = self.instructions
+		task.path = 1
+
+	def bindings(self) -> tuple[dict, dict]:
+		"""
+		Gets the names of the closure that the method reads, and their types.
+		"""
+		if self.bound is None:
+			self.bound = bind(self.closure, self.instructions)
+		return self.bound
+
+	def frame(self) -> tuple[int, ...] | None:
+		"""
+		Gets the slots of the registers that a call to the method can write.
+		"""
+		names = self.bindings()[0] if self.closure else ()
+		return registers.writes(self.instructions, self.name, *self.params, *names)
+
 	def debug(
 		self,
 		level: int = 0
@@ -387,6 +566,7 @@ class multimethod:
 		self.false = None # Path or method if false
 		self.property = cls_any # Distinguishing type property
 		self.index = 0 # Signature index
+		self.version = 0 # Invalidates dispatch caches when extended
 
 	def __call__(
 		self,
@@ -397,24 +577,45 @@ class multimethod:
 		Multiple dispatch algorithm, with help from Julia:
 		https://github.com/JeffBezanson/phdthesis
 		Binary search tree yields closest key for method, then key is verified.
-		"""
-		address, signature, arity = task.op.address, task.signature, task.op.arity
-		instance = self.true if signature else self.false
-		while instance: # Traverse tree; terminates upon reaching leaf node
-			instance = instance.true if instance.index < arity and instance.check(signature) else instance.false
-		if instance is None or instance.arity != arity:
-			task.handler.error('DISP', instance.name, signature)
-		for i, item in enumerate(signature): # Verify type signature
-			if item > instance.signature[i]:
+		The result is cached at the call site, keyed on the properties of
+		the signature, so that a repeated signature skips both steps.
+		"""
+		op, signature = task.op, task.signature
+		address, arity = op.slot, op.arity
+		for routine, version, key, instance in op.cache: # Inline cache
+			if routine is self and version == self.version:
+				for i, item in enumerate(key):
+					if item is not signature[i] and not item.matches(signature[i]):
+						break
+				else:
+					op.hits = op.hits + 1
+					break
+		else:
+			op.misses = op.misses + 1
+			instance = self.true if signature else self.false
+			while instance: # Traverse tree; terminates upon reaching leaf node
+				instance = instance.true if instance.index < arity and instance.check(signature) else instance.false
+			if instance is None or instance.arity != arity:
 				task.handler.error('DISP', instance.name, signature)
+			for i, item in enumerate(signature): # Verify type signature
+				if item > instance.signature[i]:
+					task.handler.error('DISP', instance.name, signature)
+			if len(op.cache) == presets.CACHE_SIZE: # Evict oldest signature
+				del op.cache[0]
+			op.cache.append((self, self.version, signature, instance))
 		final = instance.final
 		"""
 		Execute method and write result to registers.
 		"""
-		value = instance.routine(task, *args)
+		if op.tail and instance.instructions: # Replaces the frame of the routine
+			value = instance.tail(task, *args)
+		else:
+			value = instance.routine(task, *args)
 		if instance.instructions:
-			task.values[instance.name] = self
-			task.types[instance.name] = task.types[task.op.name]
+			slot = registers.slot(instance.name)
+			registers.extend(task.values, task.types)
+			task.values[slot] = self
+			task.types[slot] = task.types[task.op.routine]
 		task.values[address] = value
 		if value is None: # Null return override
 			task.types[address] = std_none
@@ -457,10 +658,10 @@ class multimethod:
 			left = method.instructions if method.instructions else instruction.left(method, instance)
 			right = instance.instructions if instance.instructions else instruction.right(instance)
 			instructions = [
-				instruction('.skip', instance.params[0], item.args, label = item.label)
+				instruction('.skip', instance.params[0], item.args, label = item.label, target = len(left) - i - 1)
 				if item.name == 'return'
-				else instruction(item.name, item.address, item.args, label = item.label)
-				for item in left
+				else instruction(item.name, item.address, item.args, label = item.label, target = item.target)
+				for i, item in enumerate(left)
 			] + right
 			names = ['{0}.{1}'.format(instance.name, method.name)] + method.params
 			types = [instance.final] + method.signature
@@ -490,6 +691,7 @@ class multimethod:
 		"""
 		Add a node to the tree.
 		"""
+		self.version = self.version + 1
 		if not new.signature: # Zero-argument method
 			self.false = new
 			return
@@ -532,6 +734,25 @@ class multimethod:
 					return node.set(other, new, other_criterion, i)
 		return node
 
+	def resolve(
+		self,
+		signature: list[typedef]
+		) -> method | None:
+		"""
+		Finds the method for a type signature without calling it.
+		Returns None if dispatch fails.
+		"""
+		arity = len(signature)
+		instance = self.true if signature else self.false
+		while instance: # Traverse tree; terminates upon reaching leaf node
+			instance = instance.true if instance.index < arity and instance.check(signature) else instance.false
+		if instance is None or instance.arity != arity:
+			return None
+		for i, item in enumerate(signature): # Verify type signature
+			if item > instance.signature[i]:
+				return None
+		return instance
+
 	def check(
 		self,
 		signature: list[typedef]
@@ -539,7 +760,9 @@ class multimethod:
 		"""
 		Universal dispatch check exploiting properties of structural typing.
 		"""
-		return self.property in signature[self.index].types
+		if (bit := self.property.bit):
+			return bool(signature[self.index].mask & bit)
+		return self.property in signature[self.index].extra
 
 	def collect(self) -> list[method]:
 		"""
@@ -589,6 +812,9 @@ Types are expressed by a Boolean predicate which is true for that type's
 set of values. This predicate also functions as a type check.
 """
 
+interned = WeakValueDictionary() # Table of interned typedefs
+inferred = {} # Types of recently inferred lists and records, which are held to keep their identity
+
 cls_any			= type_property('any')
 cls_none		= type_property('none')
 cls_some		= type_property('some')
@@ -651,20 +877,24 @@ def infer(
 	"""
 	name = type(value).__name__
 	name = presets.DATATYPES[name] if name in presets.DATATYPES else 'any'
-	if name == 'number' and value % 1 == 0:
+	if name == 'number' and (value.denominator == 1 if type(value) is real else value.is_integer()):
 		return typedef(std_integer)
 	datatype = types[name]
-	properties = []
-	if cls_sequence in datatype.types:
-		if name == 'string':
-			element = std_string
-		elif name == 'slice':
-			element = std_integer
-		else:
-			element = infer_element(value)
-		properties.append(cls_element(element))
-		properties.append(cls_length(len(value)))
-	definition = typedef(types[name], *properties)
+	if not datatype.mask & cls_sequence.bit:
+		return datatype
+	elif name == 'string':
+		element = cls_element(std_string)
+	elif name == 'slice':
+		element = cls_element(std_integer)
+	elif (entry := inferred.get(id(value))) and entry[0] is value: # Use cache
+		return entry[1]
+	else:
+		element = lazy_element(value)
+	definition = typedef(datatype, element, cls_length(len(value)))
+	if isinstance(element, lazy_element): # Lists and records are immutable
+		if len(inferred) == presets.INFER_SIZE: # Evict oldest sequence
+			del inferred[next(iter(inferred))]
+		inferred[id(value)] = (value, definition)
 	return definition
 
 def infer_element(
@@ -673,11 +903,25 @@ def infer_element(
 	"""
 	Infers the element type of a sequence.
 	"""
-	if isinstance(value, dict):
+	if isinstance(value, (dict, record)):
 		return reduce(typedef.__or__, [infer(i) for i in value.values()], typedef(std_any))
 	else:
 		return reduce(typedef.__or__, [infer(i) for i in value], typedef(std_any))
 
+def bind(
+	closure: dict,
+	instructions: list
+	) -> tuple[dict, dict]:
+	"""
+	Gets the names of a closure that a routine can read, and their types.
+	Closures do not change once they are set, so the result is kept by the
+	routine instead of being written and inferred again on every call.
+	"""
+	slots = registers.reads(instructions)
+	if slots is not None:
+		closure = {k: v for k, v in closure.items() if registers.slot(k) in slots}
+	return closure, {k: infer(v) for k, v in closure.items()}
+
 types = {
 	'any': std_any,
 	'none': std_none,
@@ -1,21 +1,33 @@
+from collections import deque
 from dataclasses import dataclass
 from multiprocessing import Pipe
-from typing import Any
+from typing import Any, Callable
 
 class proxy:
 	"""
 	Proxy object for a task. Represents the state of a task in the supervisor.
 	"""
-	def __init__(self, task):
+	def __init__(self, task, pipe: Callable = Pipe, stream: Any = None):
 		
-		self.calls, task.calls = Pipe() # Pipe for function calls; should only contain one value at any given time
-		self.messages, task.messages = Pipe() # Pipe for message receiving
+		self.calls, task.calls = pipe() # Pipe for function calls; should only contain one value at any given time
+		task.stream = stream # Supervisor message stream of the executor
+		self.task = task # Task object; carries a suspended task back to the pool
 		self.result = None # Return value of task
 		self.state = None # Return state of task
+		self.suspended = False # Task is parked in the supervisor
+		self.mailbox = deque() # Messages not yet received by the task
+		self.receiving = False # Task is waiting for a message
 		self.requests = [] # Tasks awaiting the return value of the key task
 		self.references = [] # Tasks that this task references
 		self.count = 0 # Reference counter
 
+	def ready(self) -> bool:
+		"""
+		Whether the task has returned, as opposed to having suspended.
+		A suspended task returns no state.
+		"""
+		return self.result is not None and self.result.ready() and self.result.get() is not None
+
 @dataclass(slots = True, repr = False)
 class reference:
 	"""
@@ -31,6 +43,20 @@ class reference:
 
 	__repr__ = __str__
 
+class suspension(Exception):
+	"""
+	Raised by a task that would otherwise block on a request to the supervisor.
+	The task is parked in the supervisor and its worker is released.
+	"""
+	def __init__(
+		self,
+		instruction: str,
+		args: tuple
+		) -> None:
+
+		self.instruction = instruction
+		self.args = args
+
 @dataclass(slots = True, repr = False)
 class message:
 	"""
@@ -25,6 +25,10 @@ _PyHASH_MODULUS = sys.hash_info.modulus
 # _PyHASH_MODULUS.
 _PyHASH_INF = sys.hash_info.inf
 
+# Range of preallocated integers, which are shared by integer arithmetic.
+_SMALL_MIN = -256
+_SMALL_MAX = 1024
+
 _RATIONAL_FORMAT = re.compile(r"""
 	(?P<real>
 	\A\s*                                 # optional whitespace at the start,
@@ -48,6 +52,8 @@ class real(numbers.Rational):
 	Significantly modified by Jeffrey Yasskin <jyasskin at gmail.com>.
 	Adapted for use in the Sophia programming language.
 	(https://github.com/python/cpython/blob/3.11/Lib/fractions.py)
+	Integers are reals with a denominator of 1, and arithmetic on two
+	integers takes a fast path that skips gcd.
 	"""
 
 	__slots__ = ('numerator', 'denominator')
@@ -191,6 +197,8 @@ class real(numbers.Rational):
 		"""a + b"""
 		na, da = a.numerator, a.denominator
 		nb, db = b.numerator, b.denominator
+		if da == 1 and db == 1:
+			return integer(na + nb)
 		if da == 1 or db == 1:
 			return real(na * db + da * nb, da * db)
 		g = gcd(da, db)
@@ -207,6 +215,8 @@ class real(numbers.Rational):
 		"""a - b"""
 		na, da = a.numerator, a.denominator
 		nb, db = b.numerator, b.denominator
+		if da == 1 and db == 1:
+			return integer(na - nb)
 		if da == 1 or db == 1:
 			return real(na * db - da * nb, da * db)
 		g = gcd(da, db)
@@ -221,6 +231,8 @@ class real(numbers.Rational):
 		"""a * b"""
 		na, da = a.numerator, a.denominator
 		nb, db = b.numerator, b.denominator
+		if da == 1 and db == 1:
+			return integer(na * nb)
 		g1 = gcd(na, db)
 		if g1 > 1:
 			na //= g1
@@ -238,6 +250,8 @@ class real(numbers.Rational):
 		# Same as _mul(), with inversed b.
 		na, da = a.numerator, a.denominator
 		nb, db = b.numerator, b.denominator
+		if da == 1 and db == 1 and nb and not na % nb: # Exact integer division
+			return integer(na // nb)
 		g1 = gcd(na, nb)
 		if g1 > 1:
 			na //= g1
@@ -268,6 +282,8 @@ class real(numbers.Rational):
 	def __mod__(a, b):
 		"""a % b"""
 		da, db = a.denominator, b.denominator
+		if da == 1 and db == 1:
+			return integer(a.numerator % b.numerator)
 		return real((a.numerator * db) % (b.numerator * da), da * db)
 
 	__rmod__ = __mod__
@@ -353,6 +369,8 @@ class real(numbers.Rational):
 		# follow the rules for numeric hashes outlined in the
 		# documentation.  (See library docs, 'Built-in Types').
 
+		if self.denominator == 1: # Integers hash the same as ints
+			return hash(self.numerator)
 		try:
 			dinv = pow(self.denominator, -1, _PyHASH_MODULUS)
 		except ValueError:
@@ -425,9 +443,39 @@ class real(numbers.Rational):
 			return self     # My components are also immutable
 		return self.__class__(self.numerator, self.denominator)
 
+_small = [real(i) for i in range(_SMALL_MIN, _SMALL_MAX + 1)]
+
+def integer(n):
+	"""
+	Constructs an integer real, reusing preallocated small integers.
+	"""
+	if _SMALL_MIN <= n <= _SMALL_MAX:
+		return _small[n - _SMALL_MIN]
+	return real(n)
+
+def integral(value):
+	"""
+	Checks if a number is an integer.
+	"""
+	return value.denominator == 1 if type(value) is real else value % 1 == 0
+
+def machine(value, flags):
+	"""
+	Converts a real to a machine float if the float flag is set.
+	In this mode, numbers are Python floats behind the same number and
+	integer type properties. Arithmetic is inexact, division and exponents
+	return the nearest float, and integral numbers print without a decimal
+	point.
+	"""
+	return float(value) if 'float' in flags and isinstance(value, real) else value
+
 @dataclass(slots = True)
 class slice:
-	"""Implements an arithmetic slice with inclusive range."""
+	"""
+	Implements an arithmetic slice with inclusive range.
+	Slices are never materialised, so that length, indexing, membership,
+	sum, reversal and composition are computed in closed form.
+	"""
 	start: int = 0
 	end: int = 0
 	step: int = 1
@@ -437,10 +485,88 @@ class slice:
 		if index >= 0:
 			return self.start + self.step * index
 		else:
-			return self.end + self.step * (index + 1)
+			return self.start + self.step * (len(self) + index)
 
 	def __iter__(self): # Custom range generator for reals
 		
+		if integral(self.start) and integral(self.step) and self.step != 0: # Iterate over Python integers
+			start, step = int(self.start), int(self.step)
+			return map(integer if type(self.start) is real else type(self.start), range(start, start + step * len(self), step))
+		return self.progression()
+
+	def __len__(self):
+
+		if self.step == 0:
+			return 0 if self.end < self.start else sys.maxsize
+		return max(int(((self.end - self.start) / self.step).__floor__()) + 1, 0)
+
+	def __contains__(self, value):
+
+		if value is True or value is False or not isinstance(value, numbers.Number):
+			return False
+		elif self.step == 0:
+			return value == self.start and self.start <= self.end
+		n = (value - self.start) / self.step # Index of value
+		return n % 1 == 0 and 0 <= n < len(self)
+
+	def __str__(self):
+
+		return '{0}:{1}:{2}'.format(self.start, self.end, self.step)
+
+	def __and__(self, other):
+		"""
+		Intersection of the integers of two slices, which is ascending.
+		"""
+		(a, i, m), (b, j, n) = self.ascending(), other.ascending()
+		g = gcd(m, n)
+		lower, upper, step = max(a, b), min(i, j), m // g * n
+		if (b - a) % g: # No common elements
+			return slice(self.start, self.start - 1, 1)
+		x = a + m * ((b - a) // g * pow(m // g, -1, n // g) % (n // g)) # Solution by the Chinese remainder theorem
+		x = lower + (x - lower) % step # Lowest common element
+		if x <= upper:
+			upper = x + (upper - x) // step * step
+		number = type(self.start) if type(self.start) is not int else real
+		return slice(number(x), number(upper), number(step))
+
+	def __or__(self, other):
+		"""
+		Union of the elements of two slices, which is ascending. The union of
+		two progressions is not a progression in general, so it is a list.
+		"""
+		return tuple(sorted(set(self) | set(other)))
+
+	def ascending(self):
+		"""
+		Gets the first and last integers and the positive step of a slice.
+		"""
+		length = len(self)
+		if self.step < 0:
+			return int(self[-1]), int(self.start), -int(self.step)
+		return int(self.start), int(self[-1]) if length else int(self.start) - 1, int(self.step)
+
+	def compose(self, index):
+		"""
+		Gets the slice of the elements of self at the indices of another slice.
+		Returns None if the indices are not a progression in self.
+		"""
+		if not (integral(index.start) and integral(index.step)) or (index.start < 0) != (index.end < 0):
+			return None
+		return slice(self[index.start], self[index.end], self.step * index.step)
+
+	def indices(self):
+		"""
+		Iterates over the slice as Python integers, for indexing sequences.
+		"""
+		if integral(self.start) and integral(self.step) and self.step != 0:
+			start, step = int(self.start), int(self.step)
+			return range(start, start + step * len(self), step)
+		return map(int, self.progression())
+
+	def progression(self):
+		"""
+		Generates the elements of the slice by repeated addition.
+		"""
 		n = self.start
 		if self.step >= 0:
 			while n <= self.end:
@@ -451,27 +577,13 @@ class slice:
 				yield n
 				n = n + self.step
 
-	def __len__(self):
-
-		return int((self.end - self.start) / self.step) + 1
+	def reverse(self):
 
-	def __str__(self):
+		if not len(self):
+			return slice(self.end, self.start, -self.step)
+		return slice(self[-1], self.start, -self.step)
 
-		return '{0}:{1}:{2}'.format(self.start, self.end, self.step)
-
-	def __and__(self, other):
-
-		n, m = self.step, other.step
-		while m != 0: # Euclidean algorithm for greatest common divisor
-			n, m = m, n % m
-		if n % (other.start - self.start) == 0: # Solution for intersection of slices
-			step = (self.step * other.step) / n # Step of intersection
-			ranges = [self.start, self.end, other.start, other.end].sort()
-			lower, upper = ranges[1], ranges[2]
-			lower = lower - (lower % step) + step # Gets highest lower bound
-			upper = upper - (upper % step) # Gets lowest upper bound
-			return slice(lower, upper, m)
-
-	def __or__(self, other):
+	def sum(self):
 
-		return tuple((list(self) + list(other)).sort())
\ No newline at end of file
+		n = len(self)
+		return n * (self.start + self.start + (n - 1) * self.step) / 2
@@ -0,0 +1,721 @@
+'''
+Persistent data structures for Sophia's sequence types.
+Every operation returns a new structure that shares most of its nodes with
+the old one, so that updating a large value does not copy it.
+'''
+from typing import Any, Iterable, Iterator
+
+BITS = 5 # Bits of an index consumed by each level of a trie
+WIDTH = 1 << BITS # Branching factor of a trie
+MASK = WIDTH - 1
+
+class vector:
+	"""
+	Persistent vector that backs the lists built by the union operator.
+	List literals, range literals, casts to list, and the lists returned by
+	&, indexing by a slice, filter, map and split are still tuples; the first
+	union copies such a list into a vector, and later unions share its trie.
+	Elements are held in a 32-way trie of tuples, except for the last
+	partial node, which is held as a tail so that appends only copy it.
+	Indexing and appending are O(log n), and a vector compares and hashes
+	like a tuple with the same elements.
+	"""
+	__slots__ = ('count', 'shift', 'root', 'tail', 'hash')
+
+	def __init__(
+		self,
+		items: Iterable = ()
+		) -> None:
+
+		self.count, self.shift, self.root, self.tail, self.hash = 0, BITS, (), (), None
+		if items:
+			self.fill(items)
+
+	def fill(
+		self,
+		items: Iterable
+		) -> None:
+		"""
+		Appends elements in place. Only used on vectors that have not been
+		shared yet.
+		"""
+		tail, count = list(self.tail), self.count
+		for item in items:
+			tail.append(item)
+			count = count + 1
+			if len(tail) == WIDTH: # Push full tail into the trie
+				self.tail, self.count = tuple(tail), count
+				self.push()
+				tail = []
+		self.tail, self.count = tuple(tail), count
+
+	def push(self) -> None:
+		"""
+		Pushes a full tail into the trie.
+		"""
+		offset = self.count - WIDTH # Index of the first element of the tail
+		if offset >= 1 << (self.shift + BITS): # Root is full
+			self.root = (self.root, self.path(self.shift, self.tail))
+			self.shift = self.shift + BITS
+		else:
+			self.root = self.insert(self.shift, self.root, offset, self.tail)
+		self.tail = ()
+
+	def path(
+		self,
+		level: int,
+		node: tuple
+		) -> tuple:
+		"""
+		Wraps a leaf in single-child nodes down from level.
+		"""
+		while level > 0:
+			node, level = (node,), level - BITS
+		return node
+
+	def insert(
+		self,
+		level: int,
+		parent: tuple,
+		offset: int,
+		leaf: tuple
+		) -> tuple:
+		"""
+		Copies the path to offset and inserts a leaf at its end.
+		"""
+		index = (offset >> level) & MASK
+		if level == BITS:
+			child = leaf
+		elif index < len(parent):
+			child = self.insert(level - BITS, parent[index], offset, leaf)
+		else:
+			child = self.path(level - BITS, leaf)
+		return parent[:index] + (child,) if index < len(parent) else parent + (child,)
+
+	def copy(self) -> 'vector':
+
+		new = vector()
+		new.count, new.shift, new.root, new.tail = self.count, self.shift, self.root, self.tail
+		return new
+
+	def append(
+		self,
+		item: Any
+		) -> 'vector':
+		"""
+		Returns a new vector with item appended.
+		"""
+		new = self.copy()
+		new.fill((item,))
+		return new
+
+	def extend(
+		self,
+		items: Iterable
+		) -> 'vector':
+		"""
+		Returns a new vector with items appended.
+		Costs O(log n) per appended item, and shares the trie of self.
+		"""
+		new = self.copy()
+		new.fill(items)
+		return new
+
+	def leaf(
+		self,
+		index: int
+		) -> tuple:
+		"""
+		Gets the node holding the element at index.
+		"""
+		if index >= self.count - len(self.tail):
+			return self.tail
+		node, level = self.root, self.shift
+		while level > 0:
+			node, level = node[(index >> level) & MASK], level - BITS
+		return node
+
+	def __getitem__(
+		self,
+		index: int | slice
+		) -> Any:
+
+		if isinstance(index, slice): # Python slices are materialised
+			return tuple(self)[index]
+		index = int(index)
+		if index < 0:
+			index = index + self.count
+		if not 0 <= index < self.count:
+			raise IndexError(index)
+		return self.leaf(index)[index & MASK]
+
+	def __iter__(self) -> Iterator:
+
+		for start in range(0, self.count - len(self.tail), WIDTH):
+			yield from self.leaf(start)
+		yield from self.tail
+
+	def __reversed__(self) -> Iterator:
+
+		return reversed(tuple(self))
+
+	def __len__(self) -> int:
+
+		return self.count
+
+	def __contains__(
+		self,
+		item: Any
+		) -> bool:
+
+		return any(i is item or i == item for i in self)
+
+	def __eq__(
+		self,
+		other: Any
+		) -> bool:
+
+		if not isinstance(other, (tuple, vector)) or len(other) != self.count:
+			return False
+		return all(x == y for x, y in zip(self, other))
+
+	def __hash__(self) -> int:
+
+		if self.hash is None:
+			self.hash = hash(tuple(self))
+		return self.hash
+
+	def __reduce__(self) -> tuple:
+		"""
+		Vectors are pickled as their elements.
+		"""
+		return vector, (tuple(self),)
+
+	def __repr__(self) -> str:
+
+		return repr(tuple(self))
+
+	__str__ = __repr__
+
+HASH = (1 << 64) - 1 # Hashes are truncated to 64 bits
+MISSING = object() # Sentinel for absent keys
+
+class node:
+	"""
+	Node of a hash array mapped trie.
+	The bitmap marks which of the 32 slots of the node are occupied, and the
+	array holds the occupied slots in order, each either a key-value pair or
+	a child node. Keys whose hashes are equal are held in a collision node,
+	whose bitmap is None and whose array is a tuple of pairs.
+	"""
+	__slots__ = ('bitmap', 'array')
+
+	def __init__(
+		self,
+		bitmap: int | None,
+		array: tuple
+		) -> None:
+
+		self.bitmap, self.array = bitmap, array
+
+	def lookup(
+		self,
+		key: Any,
+		code: int
+		) -> Any:
+		"""
+		Gets the value of key, or MISSING if the key is absent.
+		"""
+		current, shift = self, 0
+		while True:
+			if current.bitmap is None:
+				for k, v in current.array:
+					if k is key or k == key:
+						return v
+				return MISSING
+			bit = 1 << ((code >> shift) & MASK)
+			if not current.bitmap & bit:
+				return MISSING
+			entry = current.array[(current.bitmap & (bit - 1)).bit_count()]
+			if type(entry) is node:
+				current, shift = entry, shift + BITS
+			elif entry[0] is key or entry[0] == key:
+				return entry[1]
+			else:
+				return MISSING
+
+	def assoc(
+		self,
+		key: Any,
+		value: Any,
+		code: int,
+		shift: int
+		) -> tuple['node', bool]:
+		"""
+		Copies the path to key and binds it to value.
+		Returns the new node and whether the key was added.
+		"""
+		array = self.array
+		if self.bitmap is None:
+			for i, (k, _) in enumerate(array):
+				if k is key or k == key:
+					return node(None, array[:i] + ((key, value),) + array[i + 1:]), False
+			return node(None, array + ((key, value),)), True
+		bit = 1 << ((code >> shift) & MASK)
+		index = (self.bitmap & (bit - 1)).bit_count()
+		if not self.bitmap & bit:
+			return node(self.bitmap | bit, array[:index] + ((key, value),) + array[index:]), True
+		entry = array[index]
+		if type(entry) is node:
+			child, added = entry.assoc(key, value, code, shift + BITS)
+		elif entry[0] is key or entry[0] == key:
+			child, added = (key, value), False
+		else:
+			child, added = branch(entry, hash(entry[0]) & HASH, (key, value), code, shift + BITS), True
+		return node(self.bitmap, array[:index] + (child,) + array[index + 1:]), added
+
+def branch(
+	first: tuple,
+	first_code: int,
+	second: tuple,
+	second_code: int,
+	shift: int
+	) -> node:
+	"""
+	Creates the subtrie holding two pairs whose hashes agree below shift.
+	"""
+	if shift >= 64: # Hashes are equal
+		return node(None, (first, second))
+	i, j = (first_code >> shift) & MASK, (second_code >> shift) & MASK
+	if i == j:
+		return node(1 << i, (branch(first, first_code, second, second_code, shift + BITS),))
+	return node((1 << i) | (1 << j), (first, second) if i < j else (second, first))
+
+class record:
+	"""
+	Persistent map that backs the record type.
+	Values are held in a hash array mapped trie, so that lookups and updates
+	are O(log n) and an update shares all but one path with the old record.
+	Keys are kept in order of insertion in a vector, which gives records the
+	same order as a dict and O(log n) access by position.
+	"""
+	__slots__ = ('root', 'order')
+
+	def __init__(
+		self,
+		items: Iterable = ()
+		) -> None:
+
+		self.root, self.order = node(0, ()), vector()
+		if items:
+			self.fill(items)
+
+	def fill(
+		self,
+		items: Iterable
+		) -> None:
+		"""
+		Binds keys in place. Only used on records that have not been shared
+		yet.
+		"""
+		root, added = self.root, []
+		for key, value in (items.items() if isinstance(items, (dict, record)) else items):
+			root, new = root.assoc(key, value, hash(key) & HASH, 0)
+			if new:
+				added.append(key)
+		self.root = root
+		if added:
+			self.order = self.order.extend(added)
+
+	def update(
+		self,
+		items: Iterable
+		) -> 'record':
+		"""
+		Returns a new record with the keys of items bound to their values.
+		Costs O(log n) per bound key, and shares the trie of self.
+		"""
+		new = record()
+		new.root, new.order = self.root, self.order
+		new.fill(items)
+		return new
+
+	def get(
+		self,
+		key: Any,
+		default: Any = None
+		) -> Any:
+
+		value = self.root.lookup(key, hash(key) & HASH)
+		return default if value is MISSING else value
+
+	def keys(self) -> vector:
+
+		return self.order
+
+	def values(self) -> Iterator:
+
+		lookup = self.root.lookup
+		return (lookup(k, hash(k) & HASH) for k in self.order)
+
+	def items(self) -> Iterator:
+
+		lookup = self.root.lookup
+		return ((k, lookup(k, hash(k) & HASH)) for k in self.order)
+
+	def __getitem__(
+		self,
+		key: Any
+		) -> Any:
+
+		value = self.root.lookup(key, hash(key) & HASH)
+		if value is MISSING:
+			raise KeyError(key)
+		return value
+
+	def __contains__(
+		self,
+		key: Any
+		) -> bool:
+
+		return self.root.lookup(key, hash(key) & HASH) is not MISSING
+
+	def __iter__(self) -> Iterator:
+
+		return iter(self.order)
+
+	def __len__(self) -> int:
+
+		return len(self.order)
+
+	def __or__(
+		self,
+		other: Any
+		) -> 'record':
+
+		return self.update(other) if isinstance(other, (dict, record)) else NotImplemented
+
+	def __ror__(
+		self,
+		other: Any
+		) -> 'record':
+
+		return record(other).update(self) if isinstance(other, dict) else NotImplemented
+
+	def __eq__(
+		self,
+		other: Any
+		) -> bool:
+
+		if not isinstance(other, (dict, record)) or len(other) != len(self):
+			return False
+		return all(other.get(k, MISSING) == v for k, v in self.items())
+
+	__hash__ = None # Records are unhashable, like dicts
+
+	def __reduce__(self) -> tuple:
+		"""
+		Records are pickled as their items.
+		"""
+		return record, (tuple(self.items()),)
+
+	def __repr__(self) -> str:
+
+		return repr(dict(self.items()))
+
+	__str__ = __repr__
+
+LEAF = 512 # Strings up to this length are concatenated directly
+
+class strand:
+	"""
+	Node of a rope. Strands form a height-balanced binary tree whose
+	leaves are strings.
+	"""
+	__slots__ = ('left', 'right', 'length', 'height')
+
+	def __init__(
+		self,
+		left: 'str | strand',
+		right: 'str | strand'
+		) -> None:
+
+		self.left, self.right = left, right
+		self.length = len(left) + len(right)
+		self.height = max(height(left), height(right)) + 1
+
+	def __len__(self) -> int:
+
+		return self.length
+
+class rope:
+	"""
+	Persistent string that backs the string type.
+	Characters are held in a balanced tree of strands, except for the last
+	short run of them, which is held as a tail so that appends only copy
+	it. Concatenation, indexing and slicing are O(log n). A rope is
+	flattened, once, when it is converted to a string; it compares and
+	hashes like the string with the same characters, and is pickled as one.
+	"""
+	__slots__ = ('root', 'tail', 'length', 'flat')
+
+	def __init__(
+		self,
+		root: str | strand,
+		tail: str = ''
+		) -> None:
+
+		self.root, self.tail = root, tail
+		self.length = len(root) + len(tail)
+		self.flat = None
+
+	def tree(self) -> str | strand:
+		"""
+		Gets the characters of the rope as a single tree.
+		"""
+		return merge(self.root, self.tail)
+
+	def leaves(self) -> Iterator[str]:
+
+		stack = [self.tail, self.root]
+		while stack:
+			node = stack.pop()
+			if type(node) is strand:
+				stack.append(node.right)
+				stack.append(node.left)
+			else:
+				yield node
+
+	def __str__(self) -> str:
+
+		if self.flat is None:
+			self.flat = ''.join(self.leaves())
+		return self.flat
+
+	def __getitem__(
+		self,
+		index: int | slice
+		) -> 'str | rope':
+
+		if isinstance(index, slice):
+			start, stop, step = index.indices(self.length)
+			if step != 1:
+				return str(self)[index]
+			if start >= stop:
+				return ''
+			node = split(split(self.tree(), stop)[0], start)[1]
+			return node if type(node) is str else rope(node)
+		index = int(index)
+		if index < 0:
+			index = index + self.length
+		if not 0 <= index < self.length:
+			raise IndexError(index)
+		node = self.root
+		if index >= len(node):
+			return self.tail[index - len(node)]
+		while type(node) is strand:
+			if index < len(node.left):
+				node = node.left
+			else:
+				node, index = node.right, index - len(node.left)
+		return node[index]
+
+	def __iter__(self) -> Iterator[str]:
+
+		for leaf in self.leaves():
+			yield from leaf
+
+	def __len__(self) -> int:
+
+		return self.length
+
+	def __contains__(
+		self,
+		item: 'str | rope'
+		) -> bool:
+
+		return str(item) in str(self)
+
+	def __eq__(
+		self,
+		other: Any
+		) -> bool:
+
+		return isinstance(other, (str, rope)) and len(other) == self.length and str(self) == str(other)
+
+	def __lt__(self, other: Any) -> bool: return str(self) < str(other)
+
+	def __le__(self, other: Any) -> bool: return str(self) <= str(other)
+
+	def __gt__(self, other: Any) -> bool: return str(self) > str(other)
+
+	def __ge__(self, other: Any) -> bool: return str(self) >= str(other)
+
+	def __hash__(self) -> int:
+
+		return hash(str(self))
+
+	def __format__(
+		self,
+		spec: str
+		) -> str:
+
+		return format(str(self), spec)
+
+	def __reduce__(self) -> tuple:
+		"""
+		Ropes are pickled as strings.
+		"""
+		return str, (str(self),)
+
+	def __repr__(self) -> str:
+
+		return repr(str(self))
+
+def height(
+	node: str | strand
+	) -> int:
+
+	return node.height if type(node) is strand else 0
+
+def concat(
+	left: str | rope,
+	right: str | rope
+	) -> str | rope:
+	"""
+	Concatenates two strings or ropes. Short results are plain strings.
+	"""
+	if not left:
+		return right
+	if not right:
+		return left
+	if type(right) is str:
+		if type(left) is rope:
+			if len(left.tail) + len(right) <= LEAF: # Append to tail
+				return rope(left.root, left.tail + right)
+			return rope(merge(left.root, left.tail), right)
+		if len(left) + len(right) <= LEAF:
+			return left + right
+		return rope(left, right) if len(right) <= LEAF else rope(join(left, right))
+	return rope(merge(left.tree() if type(left) is rope else left, right.root), right.tail)
+
+def merge(
+	left: str | strand,
+	right: str | strand
+	) -> str | strand:
+
+	if not left:
+		return right
+	if not right:
+		return left
+	return join(left, right)
+
+def join(
+	left: str | strand,
+	right: str | strand
+	) -> strand:
+	"""
+	Joins two balanced trees into a balanced tree, in time proportional to
+	the difference of their heights.
+	"""
+	if height(left) > height(right) + 1:
+		return join_right(left, right)
+	if height(right) > height(left) + 1:
+		return join_left(left, right)
+	if type(left) is strand and type(right) is str and type(left.right) is str and len(left.right) + len(right) <= LEAF:
+		return strand(left.left, left.right + right) # Merge short leaves
+	if type(right) is strand and type(left) is str and type(right.left) is str and len(left) + len(right.left) <= LEAF:
+		return strand(left + right.left, right.right)
+	return strand(left, right)
+
+def join_right(
+	left: strand,
+	right: str | strand
+	) -> strand:
+	"""
+	Joins a shorter tree onto the right spine of a taller one.
+	"""
+	inner = left.right
+	if type(inner) is str and type(right) is str and len(inner) + len(right) <= LEAF:
+		return strand(left.left, inner + right)
+	if height(inner) <= height(right) + 1:
+		node = strand(inner, right)
+		if node.height <= height(left.left) + 1:
+			return strand(left.left, node)
+		return rotate_left(strand(left.left, rotate_right(node)))
+	node = join_right(inner, right)
+	if node.height <= height(left.left) + 1:
+		return strand(left.left, node)
+	return rotate_left(strand(left.left, node))
+
+def join_left(
+	left: str | strand,
+	right: strand
+	) -> strand:
+	"""
+	Joins a shorter tree onto the left spine of a taller one.
+	"""
+	inner = right.left
+	if type(inner) is str and type(left) is str and len(left) + len(inner) <= LEAF:
+		return strand(left + inner, right.right)
+	if height(inner) <= height(left) + 1:
+		node = strand(left, inner)
+		if node.height <= height(right.right) + 1:
+			return strand(node, right.right)
+		return rotate_right(strand(rotate_left(node), right.right))
+	node = join_left(left, inner)
+	if node.height <= height(right.right) + 1:
+		return strand(node, right.right)
+	return rotate_right(strand(node, right.right))
+
+def rotate_left(
+	node: strand
+	) -> strand:
+
+	return strand(strand(node.left, node.right.left), node.right.right)
+
+def rotate_right(
+	node: strand
+	) -> strand:
+
+	return strand(node.left.left, strand(node.left.right, node.right))
+
+def split(
+	node: str | strand,
+	index: int
+	) -> tuple[str | strand, str | strand]:
+	"""
+	Splits a tree at index in O(log n).
+	"""
+	if type(node) is str:
+		return node[:index], node[index:]
+	if index <= 0:
+		return '', node
+	if index >= node.length:
+		return node, ''
+	middle = len(node.left)
+	if index < middle:
+		left, right = split(node.left, index)
+		return left, merge(right, node.right)
+	if index > middle:
+		left, right = split(node.right, index - middle)
+		return merge(node.left, left), right
+	return node.left, node.right
+
+def substring(
+	string: str | rope,
+	indices: Iterable[int]
+	) -> str | rope:
+	"""
+	Gets the characters of a string at indices, which may be negative.
+	Contiguous ranges are sliced directly instead of character by character.
+	"""
+	length = len(string)
+	if isinstance(indices, range) and indices and (indices[0] < 0) == (indices[-1] < 0):
+		start, stop, step = indices.start, indices.stop, indices.step
+		if start < 0:
+			start, stop = start + length, stop + length
+		if step == 1:
+			return string[start:stop]
+		return str(string)[start:stop if stop >= 0 else None:step]
+	return ''.join(map(str(string).__getitem__, indices))
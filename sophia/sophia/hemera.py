@@ -1,9 +1,12 @@
+import sys
+from contextlib import contextmanager
 from cProfile import Profile
 from re import match
 from sys import stdin, stdout, stderr
-from typing import Any
+from typing import Any, Iterator
 
 from .datatypes import iris
+from .internal import registers
 from .internal.presets import ERRORS, FLAGS, REGEX_NAMESPACE
 
 streams = [ # Standard streams
@@ -12,6 +15,32 @@ streams = [ # Standard streams
 	stderr
 ]
 
+def attach(
+	*files: tuple[Any, Any, Any]
+	) -> None:
+	"""
+	Sets the standard streams of this process.
+	"""
+	global stderr
+	streams[:] = files
+	stderr = files[2]
+	sys.stdin, sys.stdout, sys.stderr = files # Used by input() and print()
+
+@contextmanager
+def redirect(
+	*files: tuple[Any, Any, Any]
+	) -> Iterator[None]:
+	"""
+	Redirects the standard streams of this process, such as to a client of
+	the daemon.
+	"""
+	previous = streams.copy()
+	attach(*files)
+	try:
+		yield
+	finally:
+		attach(*previous)
+
 class handler:
 	"""
 	Error handler class.
@@ -36,9 +65,15 @@ class handler:
 		self,
 		reference: iris.reference,
 		message: str = ''
-		) -> str:
-
-		return input(message)
+		) -> str | None:
+		"""
+		Reads a line of input. The end of input reads as null, so that the
+		task that reads it fails instead of the supervisor.
+		"""
+		try:
+			return input(message)
+		except EOFError:
+			return None
 
 	def write(
 		self,
@@ -75,11 +110,13 @@ class handler:
 			self.profiler.print_stats(sort = 'cumtime')
 		if 'namespace' in self.flags:
 			self.debug_namespace(task)
+		if 'cache' in self.flags:
+			self.debug_cache(task)
 		if 'debug' in self.flags:
 			return value
 		else:
 			task.message('terminate')
-			return task.call() # Return mutable state to supervisor
+			return task.state() # Return mutable state to supervisor
 
 	def debug_processor(
 		self,
@@ -91,6 +128,40 @@ class handler:
 		if 'processor' in self.flags:
 			self.debug_instructions(task)
 
+	def debug_checks(
+		self,
+		removed: int,
+		specialised: int
+		) -> None:
+		"""
+		Prints the number of type checks removed and specialised by the analyser.
+		"""
+		if 'processor' in self.flags:
+			print(
+				'===',
+				'{0} type checks removed, {1} specialised'.format(removed, specialised),
+				'===',
+				sep = '\n',
+				file = stderr
+			)
+
+	def debug_fold(
+		self,
+		folded: int,
+		eliminated: int
+		) -> None:
+		"""
+		Prints the number of operations folded and instructions eliminated by the parser.
+		"""
+		if 'processor' in self.flags:
+			print(
+				'===',
+				'{0} operations folded, {1} instructions eliminated'.format(folded, eliminated),
+				'===',
+				sep = '\n',
+				file = stderr
+			)
+
 	def debug_instructions(
 		self,
 		task
@@ -108,6 +179,16 @@ class handler:
             )
 		print('===', file = stderr)
 
+	def debug_source(
+		self,
+		source: str
+		) -> None:
+		"""
+		Prints the source of a generated routine.
+		"""
+		if 'source' in self.flags:
+			print('===', source, '===', sep = '\n', file = stderr)
+
 	def debug_namespace(
 		self,
 		task
@@ -115,20 +196,49 @@ class handler:
 		"""
 		Prints the user-accessible namespace.
 		"""
+		types = registers.namespace(task.types)
 		print(
             '===',
 			task.name,
 			'---',
 			'\n---\n'.join(('{0} {1} {2}'.format(
 				name,
-				task.types[name],
-				value) for name, value in task.values.items() if match(REGEX_NAMESPACE, name))
+				types[name],
+				value) for name, value in registers.namespace(task.values).items() if match(REGEX_NAMESPACE, name))
 			),
 			'===',
 			sep = '\n',
 			file = stderr
         )
 
+	def debug_cache(
+		self,
+		task
+		) -> None:
+		"""
+		Prints the dispatch cache hits and misses of each call site.
+		"""
+		hits, misses = 0, 0
+		print('===', file = stderr)
+		for i, instruction in enumerate(task.instructions):
+			if instruction.hits or instruction.misses:
+				print(
+					i,
+					instruction,
+					'hits {0}'.format(instruction.hits),
+					'misses {0}'.format(instruction.misses),
+					sep = '\t',
+					file = stderr
+				)
+				hits, misses = hits + instruction.hits, misses + instruction.misses
+		print(
+			'---',
+			'hits {0}, misses {1}'.format(hits, misses),
+			'===',
+			sep = '\n',
+			file = stderr
+		)
+
 	def debug_supervisor(
 		self,
 		message
@@ -166,6 +276,21 @@ class handler:
 			file = stderr
         )
 
+	def deadlock(
+		self
+		) -> None:
+		"""
+		Prints a deadlock warning.
+		"""
+		print(
+            '===',
+			'Deadlock',
+			'All tasks are waiting',
+			'===',
+			sep = '\n',
+			file = stderr
+        )
+
 	def timeout(
 		self
 		) -> None:
@@ -1,4 +1,4 @@
-import re
+from itertools import chain
 from typing import Any
 
 from . import presets
@@ -17,10 +17,13 @@ class lexer:
 	"""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
-		
-		self.iterator = re.finditer(presets.REGEX_LEXER, string.strip())
+		"""
+		Parses tokens that were lexed with the rest of their module, so that
+		no part of the source is lexed twice.
+		"""
+		self.iterator = chain(tokens, (('sentinel', '', 0),))
 		self.token = None
 		self.peek = None
 		self.use()
@@ -30,9 +33,8 @@ class lexer:
 		Gets the next tokens, ignoring whitespace.
 		The iterator has a guaranteed sentinel value, so no exception will be raised.
 		"""
-		self.token, self.peek = self.peek, next(self.iterator)
-		value = self.peek.group()
-		match self.peek.lastgroup:
+		self.token, (kind, value, line) = self.peek, next(self.iterator)
+		match kind:
 			case 'sentinel': # End of string
 				token = eol()
 			case 'env':
@@ -54,15 +56,8 @@ class lexer:
 			case 'literal':
 				token = name(value)
 			case 'l_parens' if value == '(' and self.prefix():
-				value = self.collect(value)
-				if re.fullmatch(presets.REGEX_TYPE_EXPR, value):
-					token = type_expression(value)
-				elif re.fullmatch(presets.REGEX_EVNT_EXPR, value):
-					token = event_expression(value)
-				elif re.fullmatch(presets.REGEX_FUNC_EXPR, value):
-					token = function_expression(value)
-				else:
-					token = parenthesis(value)
+				tokens = self.collect(value)
+				token = self.routine(tokens) or parenthesis(tokens)
 			case 'l_parens' if value == '(':
 				token = function_call(value)
 			case 'l_parens' if value == '[' and self.prefix():
@@ -122,24 +117,47 @@ class lexer:
 			   or isinstance(self.token, operator) \
 			   and not isinstance(self.token, right_bracket)
 
+	def routine(
+		self,
+		tokens: list[tuple[str, str, int]]
+		) -> node | None:
+		"""
+		Determines whether the tokens inside a set of parentheses are an
+		anonymous routine from the header before its first arrow.
+		"""
+		values = [i[1] for i in tokens]
+		if '=>' not in values[:-1]:
+			return None
+		header = tokens[:values.index('=>')]
+		names = [i[1] for i in header if i[0] == 'literal']
+		match values:
+			case ['extends', _, '=>' | 'with', *_] if header[1][0] == 'literal':
+				return type_expression(tokens)
+			case ['awaits', *_] if len(header) in (2, 3) and len(names) == len(header):
+				return event_expression(tokens)
+			case _ if parameters(header) is not None:
+				return function_expression(tokens)
+
 	def collect(
 		self,
 		symbol: str
-		) -> str:
+		) -> list[tuple[str, str, int]]:
 		"""
-		Collects the contents of a set of brackets.
+		Collects the tokens inside a set of brackets, which are parsed by
+		another lexer without being lexed again.
 		"""
-		string, count = '', 1
+		tokens, count = [], 1
 		while count:
-			value = next(self.iterator).group()
+			token = next(self.iterator)
+			value = token[1]
 			if value == symbol:
 				count = count + 1
 			elif value == presets.PARENS[symbol]:
 				count = count - 1
 				if not count:
 					break
-			string = string + ' ' + value
-		return string.strip()
+			tokens.append(token)
+		return tokens
 
 class eol:
 	"""Sentinel object for the lexer."""
@@ -330,13 +348,14 @@ class type_expression(anonymous):
 	"""Defines a type expression."""
 	def __init__(
 		self, 
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 		
-		string, expression = re.split(r'=>\s*', string, 1)
+		values = [i[1] for i in tokens]
+		i = values.index('=>')
 		name = '@'
-		supertype = re.split(' ', re.search(r'extends \w+', string).group(), 1)[1]
-		prototype = re.split(' ', re.search(r'with .+', string).group(), 1)[1] if 'with' in string else ''
+		supertype = values[1]
+		prototype, expression = tokens[3:i], tokens[i + 1:]
 		super().__init__(name, name, {name: supertype})
 		if prototype:
 			self.nodes.append(lexer(prototype).parse())
@@ -363,13 +382,13 @@ class event_expression(anonymous):
 	"""Defines a type expression."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 
-		string, expression = re.split(r'\s*=>\s*', string, 1)
-		expression, final = re.split(r'\s*=>\s*(?=\w+$)', expression, 1) if re.search(r'(?<==>)\s*\w+$', expression) else (expression, 'any')
-		string = re.split(' ', re.search(r'awaits \w+( \w+)?', string).group(), 1)[1]
-		check, message = re.split(r' ', string, 1) if ' ' in string else ('any', string)
+		values = [i[1] for i in tokens]
+		i = values.index('=>')
+		expression, final = body(tokens[i + 1:])
+		check, message = values[1:i] if i == 3 else ('any', values[1])
 		params = {'@': final, message: check}
 		super().__init__('@', final, params)
 		self.nodes = [lexer(expression).parse()]
@@ -395,16 +414,13 @@ class function_expression(anonymous):
 	"""Defines a type expression."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 		
-		string, expression = re.split(r'\s*=>\s*', string, 1)
-		expression, final = re.split(r'\s*=>\s*(?=\w+$)', expression, 1) if re.search(r'(?<==>)\s*\w+$', expression) else (expression, 'any')
-		params = {'@': final}
-		for value in re.finditer(r'\w+( \w+)?', string):
-			param = value.group()
-			typename, param = re.split(r' ', param, 1) if ' ' in param else ('any', param)
-			params[param] = typename
+		values = [i[1] for i in tokens]
+		i = values.index('=>')
+		expression, final = body(tokens[i + 1:])
+		params = {'@': final} | parameters(tokens[:i])
 		super().__init__('@', final, params)
 		self.nodes = [lexer(expression).parse()]
 
@@ -418,6 +434,36 @@ class function_expression(anonymous):
 		return (ins('return', '0', [self.nodes[0].register]),
 				ins('END'))
 
+def parameters(
+	tokens: list[tuple[str, str, int]]
+	) -> dict[str, str] | None:
+	"""
+	Gets the parameters and their types from a parameter list, which is
+	a comma-separated list of names that may be preceded by a type.
+	Returns None if the tokens are not a parameter list.
+	"""
+	params, group = {}, []
+	for kind, value, line in chain(tokens, (('operator', ',', 0),)):
+		if kind == 'literal':
+			group.append(value)
+		elif value != ',' or len(group) > 2:
+			return None
+		elif group:
+			typename, param = group if len(group) == 2 else ('any', group[0])
+			params[param], group = typename, []
+	return params
+
+def body(
+	tokens: list[tuple[str, str, int]]
+	) -> tuple[list[tuple[str, str, int]], str]:
+	"""
+	Splits the body of an anonymous routine from its return type, which
+	follows a second arrow.
+	"""
+	if len(tokens) > 2 and tokens[-2][1] == '=>' and tokens[-1][0] == 'literal':
+		return tokens[:-2], tokens[-1][1]
+	return tokens, 'any'
+
 class operator(expression):
 	"""Generic operator node."""
 	def __init__(
@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
-from typing import Self
+from typing import Callable, Self
+
+from . import registers
 
 @dataclass(slots = True, repr = False)
 class instruction:
@@ -7,16 +9,37 @@ class instruction:
 	Instructions used in Sophia's virtual machine.
 	Internal instructions use the prefix '.'.
 	Labels have no return address.
+	Registers are pre-resolved to slots in the register file.
 	"""
 	name: str											# Name of the command to be called.
 	address: str = ''									# Return address.
 	args: list[str] = field(default_factory = list)		# Argument addresses.
 	label: list[str] = field(default_factory = list)	# Additional information.
+	target: int | None = None							# Jump target, relative to the next instruction.
+	tail: bool = False									# Call in tail position.
 	arity: int = field(init = False)					# Number of arguments.
+	slot: int | None = field(init = False)				# Slot of the return address.
+	slots: tuple[int, ...] = field(init = False)		# Slots of the argument addresses.
+	routine: int | None = field(init = False)			# Slot of the command to be called.
+	labels: tuple[int, ...] = field(init = False)		# Slots of the names in the label.
+	cache: list[tuple] = field(init = False, default_factory = list)	# Inline dispatch cache.
+	hits: int = field(init = False, default = 0)		# Dispatch cache hits.
+	misses: int = field(init = False, default = 0)		# Dispatch cache misses.
+	step: Callable | None = field(init = False, default = None)	# Compiled closure for the threaded backend.
+	code: Callable | bool | None = field(init = False, default = None)	# Generated routine headed by this label.
+	writes: tuple[int, ...] | bool | None = field(init = False, default = None)	# Slots written by the routine headed by this label.
+	reads: frozenset[int] | bool | None = field(init = False, default = None)	# Slots read by the routine headed by this label.
 
 	def __post_init__(self) -> None:
 
 		self.arity = len(self.args)
+		self.resolve()
+
+	def __reduce__(self) -> tuple:
+		"""
+		Slots are local to a process, so instructions are pickled by name.
+		"""
+		return type(self), (self.name, self.address, self.args, self.label, self.target, self.tail)
 
 	def __str__(self) -> str:
 		
@@ -32,6 +55,21 @@ class instruction:
 
 	__repr__ = __str__
 
+	def resolve(self) -> Self:
+		"""
+		Resolves the registers of the instruction to slots.
+		Must be called again whenever the registers are rewritten.
+		"""
+		self.step = None # Invalidate compiled closure
+		if self.address:
+			self.slot = registers.slot(self.address)
+			self.slots = tuple(registers.slot(i) for i in self.args)
+			self.routine = registers.slot(self.name)
+			self.labels = tuple(registers.slot(i) for i in self.label)
+		else: # Labels have no registers
+			self.slot, self.slots, self.routine, self.labels = None, (), None, ()
+		return self
+
 	@classmethod
 	def left(
 		cls,
@@ -11,6 +11,7 @@ class node:
 		self.length = 0 # Performance optimisation
 		self.register = '0' # Register that this node returns to
 		self.scope = 0
+		self.line = 0 # Line of the source that the node starts on
 		self.active = -1 # Indicates path index for activation of start()
 		self.branch = False # Else statement
 		self.block = False # Generates start and end labels
@@ -4,6 +4,7 @@ ALIASES = {
 	'num': 'number',
 	'str': 'string'
 }
+CACHE_SIZE = 4 # Number of signatures held by the dispatch cache of a call site
 BP = ( # The left-binding power of a binary operator is expressed by its position in this tuple of tuples
 	(')', ']', '}'),
 	(',',),
@@ -38,9 +39,13 @@ DATATYPES = { # Base data types
 	'funcdef': 'function',
 	'bool': 'boolean',
 	'real': 'number',
+	'float': 'number',
 	'str': 'string',
+	'rope': 'string',
 	'tuple': 'list',
+	'vector': 'list',
 	'dict': 'record',
+	'record': 'record',
 	'slice': 'slice',
 	'reference': 'future'
 }
@@ -57,16 +62,45 @@ ERRORS = {
 	'WRIT': 'Stream {0} not writeable'
 }
 FLAGS = (
+	'cache',
 	'debug',
+	'float',
+	'generate',
 	'instructions',
 	'namespace',
 	'processor',
 	'profile',
+	'serial',
+	'source',
 	'supervisor',
 	'suppress',
 	'task',
+	'threaded',
+	'threads',
 	'tree'
 )
+FOLDABLE = ( # Operators without side effects, which are evaluated at compile time on constants
+	'+',
+	'-',
+	'*',
+	'/',
+	'^',
+	'%',
+	'=',
+	'!=',
+	'<',
+	'>',
+	'<=',
+	'>=',
+	'in',
+	'not',
+	'and',
+	'or',
+	'xor',
+	'&',
+	'|'
+)
+INFER_SIZE = 64 # Number of lists and records whose inferred types are cached
 INFIX_R = [
 	'^',
 	'->',
@@ -92,6 +126,7 @@ PROPERTIES = (
 	'element',
 	'length'
 )
+RESIDENT_SIZE = 256 # Number of compiled modules held in memory by the bytecode cache
 STDLIB_NAMES = {
 	# Streams
 	'stdin': 'stdin',
@@ -188,83 +223,33 @@ STDLIB_TYPES = (
 	'element',
 	'length'
 )
+TRAILING = (',', ';', '(', '[', '{') # Symbols after which a line continues onto the next
 """
-Regex line patterns.
+Regex token patterns.
 """
 REGEX_EMPTY = r'((\s*\n?)|(\s*//.*\n?))*' # Matches any empty source file
-REGEX_COMMENT = r'(?P<comment>\s*//.*?(\n|$))'
-REGEX_UNMATCHED = r'(?P<unmatched>(\'[^\']*?)|(\"[^\"]*?))' # Detects unmatched quotes
-REGEX_TRAILING = r'(?P<trailing>(?<=[,;\(\[\{])\n\s*)'
-REGEX_FINAL = r'(?P<final>\n|$)'
-REGEX_LINE = r'(?P<line>.+(?=\n|$))'
-REGEX_SENTINEL = r'(?P<sentinel>$)'
-"""
-Regex statement patterns.
-"""
-REGEX_SPACE		= r'(?P<space> +)'
-REGEX_INDENT	= r'(?P<indent>\t+)'
-REGEX_ELSE		= r'(?P<else>else:$)'
-REGEX_BRANCH	= r'(?P<branch>else )'
-REGEX_CONTINUE	= r'(?P<continue>continue$)'
-REGEX_BREAK		= r'(?P<break>break$)'
-REGEX_IF		= r'(?P<if>if .+:$)'
-REGEX_WHILE		= r'(?P<while>while .+:$)'
-REGEX_FOR		= r'(?P<for>for \w+( \w+)? in .+:$)'
-REGEX_RETURN	= r'(?P<return>return( .+)?$)'
-REGEX_LINK		= r'(?P<link>link (\w+(,\s*|$))+)'
-REGEX_USE		= r'(?P<use>use (\w+(,\s*)?)+(\s*from\s+\w+)?)'
-REGEX_START		= r'(?P<start>start:$)'
-REGEX_TYPE		= r'(?P<type>type \w+( extends \w+)?( with .*)?((:$)|(\s*=>\s*.+)))'
-REGEX_EVENT		= r'(?P<event>.+( .+)? awaits \w+( \w+)?\s*\((\w+( \w+)?(,\s*)?)*\)((:$)|(\s*=>\s*.+)))'
-REGEX_FUNCTION	= r'(?P<function>.+( .+)?\s*\((\w+( \w+)?(,\s*)?)*\)((:$)|(\s*=>\s*.+)))'
-REGEX_ASSIGN	= r'(?P<assign>(\w+( \w+)?:\s*.+((;\s*)|$))+$)'
-REGEX_EXPR		= r'(?P<expression>.+)'
-"""
-Regex expression patterns.
-"""
-REGEX_TYPE_EXPR = r'(?P<type_expression>extends \w+( with .*)?\s*=>\s*.+)'
-REGEX_EVNT_EXPR = r'(?P<event_expression>awaits \w+( \w+)?\s*=>\s*.+(=>.+$)?)'
-REGEX_FUNC_EXPR = r'(?P<func_expression>(\w+( \w+)?(,\s*)?)*\s*=>\s*.+(=>.+$)?)'
+REGEX_STRING	= r'(?P<string>(\'.*?\')|(\".*?\"))' # Any symbols between single or double quotes
+REGEX_COMMENT	= r'(?P<comment>//.*)'
+REGEX_UNMATCHED	= r'(?P<unmatched>[\'\"])' # Quote without a closing quote on its line
+REGEX_NEWLINE	= r'(?P<newline>\n)'
+REGEX_SPACE		= r'(?P<space>[^\S\n]+)' # Indentation at the start of a line
 REGEX_ENV		= r'(?P<env>\@)'
 REGEX_NUMBER	= r'(?P<number>[+-]?\d+(\.\d*)?)' # Any number of the format x(.y)
-REGEX_STRING	= r'(?P<string>(\'.*?\')|(\".*?\"))' # Any symbols between single or double quotes
 REGEX_LITERAL	= r'(?P<literal>\w+)' # Any word
 REGEX_L_PARENS	= r'(?P<l_parens>[\(\[\{])'
 REGEX_R_PARENS	= r'(?P<r_parens>[\)\]\}])'
-REGEX_OPERATOR	= r'(?P<operator>[^\s\d\w\(\[\{\@]+)' # Any other symbol
+REGEX_OPERATOR	= r'(?P<operator>[,:;]|([^\s\w\(\)\[\]\{\}\@\'\",:;/]|/(?!/))+)' # Any other run of symbols; separators stand alone
 """
 Regex combinations.
 """
-REGEX_MATCHED = '|'.join((REGEX_STRING, REGEX_UNMATCHED))
-REGEX_BALANCED = '|'.join((REGEX_STRING, REGEX_L_PARENS, REGEX_R_PARENS))
-REGEX_ALIAS = '|'.join((REGEX_STRING, REGEX_LITERAL))
-REGEX_SPLIT = '|'.join((REGEX_TRAILING, REGEX_FINAL, REGEX_LINE))
-REGEX_STATEMENT = '|'.join((
-	REGEX_SENTINEL,
+REGEX_TOKEN = '|'.join((
+	REGEX_STRING,
+	REGEX_COMMENT,
+	REGEX_UNMATCHED,
+	REGEX_NEWLINE,
 	REGEX_SPACE,
-	REGEX_INDENT,
-	REGEX_ELSE,
-	REGEX_BRANCH,
-	REGEX_CONTINUE,
-	REGEX_BREAK,
-	REGEX_IF,
-	REGEX_WHILE,
-	REGEX_FOR,
-	REGEX_RETURN,
-	REGEX_LINK,
-	REGEX_USE,
-	REGEX_START,
-	REGEX_TYPE,
-	REGEX_EVENT,
-	REGEX_FUNCTION,
-	REGEX_ASSIGN,
-	REGEX_EXPR
-))
-REGEX_LEXER = '|'.join((
-	REGEX_SENTINEL,
 	REGEX_ENV,
 	REGEX_NUMBER,
-	REGEX_STRING,
 	REGEX_LITERAL,
 	REGEX_L_PARENS,
 	REGEX_R_PARENS,
@@ -0,0 +1,168 @@
+'''
+Register file for Sophia's virtual machine.
+Every register name is assigned a dense integer slot, so that the namespace of
+a task can be stored as parallel lists of values and types. The table is
+global to the process; state that crosses a process boundary is transferred
+by name and laid out again on arrival.
+The table is emptied for every program, so that the frames of a process that
+runs many programs are only as wide as the registers of the current one.
+'''
+from threading import Lock
+
+class unbound:
+	"""
+	Sentinel for an unbound register.
+	Any use of the register is treated as a failed name lookup.
+	"""
+	__slots__ = ('name',)
+
+	def __init__(
+		self,
+		name: str
+		) -> None:
+
+		self.name = name
+
+	def __getattr__(self, attr): raise KeyError(self.name)
+
+	def __reduce__(self) -> tuple: return unbound, (self.name,) # Bypasses __getattr__ when unpickled
+
+	def __call__(self, *args): raise KeyError(self.name)
+
+	def __str__(self) -> str: return '<unbound {0}>'.format(self.name)
+
+	__repr__ = __str__
+
+slots = {} # Slot of each register name
+names = [] # Register name of each slot
+empty = [] # Unbound sentinel of each slot
+lock = Lock() # Guards the assignment of slots between threads
+generation = 0 # Program whose registers are in the table
+
+def reset(
+	program: int | None = None
+	) -> None:
+	"""
+	Empties the table for a new program. A worker process empties its table
+	when it receives the first task of a later program, whose generation is
+	given; frames and instructions already in the process keep their slots.
+	"""
+	global slots, names, empty, generation
+	with lock:
+		if program is None:
+			program = generation + 1
+		elif program <= generation:
+			return
+		slots, names, empty, generation = {}, [], [], program
+
+def slot(
+	name: str
+	) -> int:
+	"""
+	Gets the slot of a register, assigning a new slot if necessary.
+	"""
+	try:
+		return slots[name]
+	except KeyError:
+		with lock:
+			if name not in slots:
+				names.append(name)
+				empty.append(unbound(name))
+				slots[name] = len(names) - 1
+			return slots[name]
+
+def extend(
+	*frames: tuple[list, ...]
+	) -> None:
+	"""
+	Pads register frames with any slots assigned since their creation.
+	"""
+	for frame in frames:
+		if len(frame) < len(empty):
+			frame.extend(empty[len(frame):])
+
+def update(
+	frame: list,
+	namespace: dict
+	) -> list:
+	"""
+	Writes a namespace into a register frame.
+	"""
+	indices = [slot(name) for name in namespace]
+	extend(frame)
+	for i, value in zip(indices, namespace.values()):
+		frame[i] = value
+	return frame
+
+def frame(
+	namespace: dict
+	) -> list:
+	"""
+	Lays out a namespace as a new register frame.
+	"""
+	return update(empty.copy(), namespace)
+
+def namespace(
+	frame: list
+	) -> dict:
+	"""
+	Gets the bound registers of a frame by name.
+	"""
+	return {names[i]: value for i, value in enumerate(frame) if type(value) is not unbound}
+
+def writes(
+	instructions: list,
+	*names: str
+	) -> tuple[int, ...] | None:
+	"""
+	Gets the slots of the registers that a routine can write, which are the
+	only registers that its caller needs to save.
+	The slots of the instructions are cached on the label that heads the
+	routine; names are the registers written on entry to the routine.
+	Returns None if the routine can write registers that are only known at
+	runtime.
+	"""
+	head = instructions[0]
+	if head.writes is None:
+		found = set()
+		for op in instructions:
+			if op.name == '.use': # Imports any name of a module
+				head.writes = False
+				break
+			if op.address:
+				found.add(op.slot)
+				found.update(op.labels)
+				if op.name in ('.break', '.next'): # Sanitise their arguments
+					found.update(op.slots)
+		else:
+			head.writes = tuple(found)
+	if head.writes is False:
+		return None
+	return head.writes + tuple(slot(name) for name in names)
+
+def reads(
+	instructions: list
+	) -> frozenset[int] | None:
+	"""
+	Gets the slots of the registers that a routine and the routines that it
+	defines can read, which are the only names of a closure that it needs.
+	The slots are cached on the label that heads the routine.
+	Returns None if the routine can read registers that are only known at
+	runtime.
+	"""
+	head = instructions[0]
+	if head.reads is None:
+		found = set()
+		for op in instructions:
+			if op.name in ('.meta', '.use'): # Reads any name
+				head.reads = False
+				break
+			if op.address:
+				found.add(op.routine)
+				found.update(op.slots)
+				found.update(op.labels)
+		else:
+			head.reads = frozenset(found)
+	if head.reads is False:
+		return None
+	return head.reads
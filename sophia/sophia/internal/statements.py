@@ -1,9 +1,22 @@
-import re
-
-from .expressions import lexer
+from .expressions import lexer, parameters
 from .nodes import node
 from .instructions import instruction as ins
 
+def split(
+	tokens: list[tuple[str, str, int]],
+	symbol: str
+	) -> list[list[tuple[str, str, int]]]:
+	"""
+	Splits tokens on a separator.
+	"""
+	groups = [[]]
+	for token in tokens:
+		if token[1] == symbol:
+			groups.append([])
+		else:
+			groups[-1].append(token)
+	return groups
+
 class statement(node):
 	"""Base statement node."""
 	def __str__(self) -> str: return ('else ' if self.branch else '') + type(self).__name__
@@ -46,13 +59,15 @@ class type_statement(coroutine):
 	"""Defines a type definition."""
 	def __init__(
 		self, 
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 		
-		string, expression = re.split(r'=>\s*', string, 1) if '=>' in string else (string[:-1], None)
-		name = re.split(' ', re.search(r'type \w+', string).group(), 1)[1]
-		supertype = re.split(' ', re.search(r'extends \w+', string).group(), 1)[1] if 'extends' in string else 'any'
-		prototype = re.split(' ', re.search(r'with .+', string).group(), 1)[1] if 'with' in string else ''
+		values = [i[1] for i in tokens]
+		i = values.index('=>') if '=>' in values else len(values) - 1 # Strip colon
+		name = values[1]
+		supertype, start = (values[3], 4) if values[2] == 'extends' else ('any', 2)
+		prototype = tokens[start + 1:i] if values[start] == 'with' else []
+		expression = tokens[i + 1:]
 		super().__init__(name, name, {name: supertype})
 		if prototype:
 			self.nodes.append(lexer(prototype).parse())
@@ -79,23 +94,19 @@ class event_statement(coroutine):
 	"""Defines an event definition."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 
-		string, expression = re.split(r'=>\s*', string, 1) if '=>' in string else (string, None)
-		name, string = re.split(r' awaits ', string, 1)
-		final, name = re.split(r' ', name, 1) if ' ' in name else ('any', name)
-		message, string = re.split(r'\s*\(', string, 1)
-		check, message = re.split(r' ', message, 1) if ' ' in message else ('any', message)
-		params = {name: final}
-		for value in re.finditer(r'\w+( \w+)?', string):
-			param = value.group()
-			typename, param = re.split(r' ', param, 1) if ' ' in param else ('any', param)
-			params[param] = typename
-		params = params | {message: check}
+		values = [i[1] for i in tokens]
+		i = values.index('awaits')
+		j = values.index('(', i)
+		k = values.index(')', j)
+		final, name = values[:i] if i == 2 else ('any', values[0])
+		check, message = values[i + 1:j] if j - i == 3 else ('any', values[i + 1])
+		params = {name: final} | parameters(tokens[j + 1:k]) | {message: check}
 		super().__init__(name, final, params)
-		if expression:
-			self.nodes = [return_statement('return ' + expression)]
+		if values[k + 1] == '=>':
+			self.nodes = [return_statement(tokens[k + 1:])]
 
 	def start(self) -> tuple[ins, ...]:
 		
@@ -111,20 +122,17 @@ class function_statement(coroutine):
 	"""Defines a function definition."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 		
-		string, expression = re.split(r'=>\s*', string, 1) if '=>' in string else (string, None)
-		name, string = re.split(r'\s*\(', string, 1)
-		final, name = re.split(r' ', name, 1) if ' ' in name else ('any', name)
-		params = {name: final}
-		for value in re.finditer(r'\w+( \w+)?', string):
-			param = value.group()
-			typename, param = re.split(r' ', param, 1) if ' ' in param else ('any', param)
-			params[param] = typename
+		values = [i[1] for i in tokens]
+		j = values.index('(')
+		k = values.index(')', j)
+		final, name = values[:j] if j == 2 else ('any', values[0])
+		params = {name: final} | parameters(tokens[j + 1:k])
 		super().__init__(name, final, params)
-		if expression:
-			self.nodes = [return_statement('return ' + expression)]
+		if values[k + 1] == '=>':
+			self.nodes = [return_statement(tokens[k + 1:])]
 
 	def start(self) -> tuple[ins, ...]:
 		
@@ -140,19 +148,16 @@ class assignment(statement):
 	"""Defines an assignment. Supports multiple assignment."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 		
 		binds, expressions = {}, []
-		while string:
-			name, string = re.split(r':\s*', string, 1)
-			typename, name = re.split(r' ', name, 1) if ' ' in name else ('?', name)
+		for tokens in split(tokens, ';'):
+			values = [i[1] for i in tokens[:3]]
+			i = values.index(':')
+			typename, name = values[:i] if i == 2 else ('?', values[0])
 			binds[name] = typename
-			if ';' in string:
-				expression, string = re.split(r';\s*', string, 1)
-			else:
-				expression, string = string, ''
-			expressions.append(lexer(expression).parse())
+			expressions.append(lexer(tokens[i + 1:]).parse())
 		super().__init__(*expressions)
 		self.binds = binds
 
@@ -171,11 +176,10 @@ class if_statement(statement):
 	"""Defines an if statement."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 
-		expression = re.split(r' ', string, 1)[1][:-1] # Strip colon
-		super().__init__(lexer(expression).parse())
+		super().__init__(lexer(tokens[1:-1]).parse()) # Strip colon
 		self.active = 1
 		self.block = True
 
@@ -191,11 +195,10 @@ class while_statement(statement):
 	"""Defines a while statement."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 
-		expression = re.split(r' ', string, 1)[1][:-1] # Strip colon
-		super().__init__(lexer(expression).parse())
+		super().__init__(lexer(tokens[1:-1]).parse()) # Strip colon
 		self.active = 1
 		self.block = True
 
@@ -211,13 +214,13 @@ class for_statement(statement):
 	"""Defines a for statement."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 
-		string = re.split(r' ', string, 1)[1][:-1] # Strip colon
-		index, iterator = re.split(r' in ', string, 1)
-		typename, index = re.split(r' ', index, 1) if ' ' in index else ('?', index)
-		super().__init__(lexer(iterator).parse())
+		values = [i[1] for i in tokens[:4]]
+		i = values.index('in')
+		typename, index = values[1:i] if i == 3 else ('?', values[1])
+		super().__init__(lexer(tokens[i + 1:-1]).parse()) # Strip colon
 		self.active = 1
 		self.index = index
 		self.typename = typename
@@ -242,12 +245,11 @@ class return_statement(statement):
 	"""Defines a return statement."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 		
-		if ' ' in string:
-			expression = re.split(r' ', string, 1)[1]
-			super().__init__(lexer(expression).parse())
+		if len(tokens) > 1:
+			super().__init__(lexer(tokens[1:]).parse())
 		else:
 			super().__init__()
 
@@ -263,12 +265,11 @@ class link_statement(statement):
 	"""Defines a link."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 		
 		super().__init__()
-		string = re.split(r' ', string, 1)[1]
-		self.links = re.split(r',\s*', string)
+		self.links = [i[1] for i in tokens[1::2]]
 
 	def __str__(self) -> str: return ('else ' if self.branch else '') + 'link_statement ' + ' '.join(self.links)
 
@@ -280,13 +281,15 @@ class use_statement(statement):
 	"""Defines a use statement."""
 	def __init__(
 		self,
-		string: str
+		tokens: list[tuple[str, str, int]]
 		) -> None:
 		
 		super().__init__()
-		string = re.split(r' ', string, 1)[1]
-		string, self.source = re.split(r'\s*from\s*', string) if 'from' in string else (string, '0')
-		self.routines = re.split(r',\s*', string)
+		if len(tokens) > 2 and tokens[-2][1] == 'from':
+			tokens, self.source = tokens[:-2], tokens[-1][1]
+		else:
+			self.source = '0'
+		self.routines = [i[1] for i in tokens[1::2]]
 
 	def __str__(self) -> str: return ('else ' if self.branch else '') + 'use_statement ' + ' '.join(self.routines)
 
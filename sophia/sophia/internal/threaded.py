@@ -0,0 +1,78 @@
+'''
+Threaded-code backend for Sophia's virtual machine.
+Each instruction is compiled once into a Python closure with its operands and
+handler pre-bound, so that the runtime loop only has to call the next closure.
+'''
+from typing import Any, Callable
+
+from .instructions import instruction
+
+def label(task) -> None:
+	"""
+	Labels do nothing at runtime.
+	"""
+	return None
+
+def compile_step(
+	op: instruction,
+	interns: dict[str, Callable]
+	) -> Callable:
+	"""
+	Compiles an instruction into a closure that takes the running task.
+	The closure is cached on the instruction until its registers are
+	resolved again.
+	"""
+	if not op.address:
+		op.step = label
+		return label
+	slots = op.slots
+	if (handler := interns.get(op.name)) is None: # Dispatch through the routine register
+		routine = op.routine
+		match len(slots):
+			case 0:
+				def step(task) -> Any:
+					task.op, task.signature = op, []
+					return task.values[routine](task)
+			case 1:
+				x, = slots
+				def step(task) -> Any:
+					task.op, task.signature = op, [task.types[x]]
+					values = task.values
+					return values[routine](task, values[x])
+			case 2:
+				x, y = slots
+				def step(task) -> Any:
+					types = task.types
+					task.op, task.signature = op, [types[x], types[y]]
+					values = task.values
+					return values[routine](task, values[x], values[y])
+			case _:
+				def step(task) -> Any:
+					types, values = task.types, task.values
+					task.op, task.signature = op, [types[i] for i in slots]
+					return values[routine](task, *[values[i] for i in slots])
+	else: # Internal instructions
+		match len(slots):
+			case 0:
+				def step(task) -> Any:
+					task.op, task.signature = op, []
+					return handler(task)
+			case 1:
+				x, = slots
+				def step(task) -> Any:
+					task.op, task.signature = op, [task.types[x]]
+					return handler(task, task.values[x])
+			case 2:
+				x, y = slots
+				def step(task) -> Any:
+					types = task.types
+					task.op, task.signature = op, [types[x], types[y]]
+					values = task.values
+					return handler(task, values[x], values[y])
+			case _:
+				def step(task) -> Any:
+					types, values = task.types, task.values
+					task.op, task.signature = op, [types[i] for i in slots]
+					return handler(task, *[values[i] for i in slots])
+	op.step = step
+	return step
@@ -0,0 +1,297 @@
+'''
+Source generator for Sophia's virtual machine.
+Translates the instructions of a routine into the source of a Python function,
+with structured control flow recovered from START, ELSE, and END, and loads it
+with compile() and exec().
+'''
+from typing import Any, Callable
+
+from .instructions import instruction
+
+UNTRANSLATABLE = ( # Instructions that require the interpreter
+	'.future',
+	'.link',
+	'.meta',
+	'.skip',
+	'.use'
+)
+
+class untranslatable(Exception):
+	"""
+	Raised when a routine cannot be translated.
+	"""
+
+class translator:
+	"""
+	Generates the source of a Python function from a routine.
+	Registers remain slots in the register file of the task, but the frame
+	is held in locals and every operand is a constant index.
+	Calls that enter a user routine descend into it, and control returns to
+	the generated function when the routine returns.
+	"""
+	def __init__(
+		self,
+		instructions: list[instruction],
+		interns: dict[str, Callable]
+		) -> None:
+
+		self.instructions = instructions
+		self.interns = interns
+		self.names = {} # Globals of the generated function
+		self.lines = []
+		self.flags = 0 # Number of loop exit flags
+		self.ends, stack = {}, [] # End of each block
+		for i, op in enumerate(instructions):
+			if not op.address:
+				if op.name == 'END':
+					if not stack:
+						raise untranslatable(op)
+					self.ends[stack.pop()] = i
+				else:
+					stack.append(i)
+		if stack or self.ends.get(0) != len(instructions) - 1:
+			raise untranslatable(instructions[0])
+		self.emit(1, 'frame, values, types, value = task.caller, task.values, task.types, None')
+		self.emit(1, 'try:')
+		self.sequence(1, len(instructions) - 1, 2, False)
+		self.emit(1, 'except KeyError as e:')
+		self.emit(2, 'task.handler.error(\'FIND\', e.args[0])')
+		self.emit(1, 'return value')
+		self.source = '\n'.join(['def routine(task):'] + self.lines) + '\n'
+
+	def emit(
+		self,
+		level: int,
+		line: str
+		) -> None:
+
+		self.lines.append('\t' * level + line)
+
+	def load(
+		self,
+		descend: Callable
+		) -> Callable:
+		"""
+		Compiles the generated source and returns the function.
+		"""
+		namespace = self.names | {'descend': descend}
+		exec(compile(self.source, '<{0}>'.format(self.instructions[0].label[0]), 'exec'), namespace)
+		return namespace['routine']
+
+	def skip(
+		self,
+		i: int
+		) -> int:
+		"""
+		Gets the index after the statement or definition at i.
+		"""
+		op = self.instructions[i]
+		if not op.address:
+			return self.ends[i] + 1
+		elif op.name in ('.function', '.type'):
+			return self.ends[i + 1] + 1
+		elif op.name == '.event':
+			return self.ends[self.ends[i + 1] + 1] + 1
+		else:
+			return i + 1
+
+	def condition(
+		self,
+		start: int,
+		end: int
+		) -> int | None:
+		"""
+		Finds the conditional branch of a block.
+		"""
+		i = start
+		while i < end:
+			op = self.instructions[i]
+			if op.name == 'if' and op.args:
+				return i
+			i = self.skip(i)
+
+	def sequence(
+		self,
+		start: int,
+		end: int,
+		level: int,
+		loop: bool
+		) -> None:
+		"""
+		Translates the instructions of a block between start and end.
+		"""
+		lines = len(self.lines)
+		i = start
+		while i < end:
+			op = self.instructions[i]
+			if not op.address:
+				if op.name != 'START':
+					raise untranslatable(op)
+				i = self.chain(i, level, loop)
+				continue
+			match op.name:
+				case '.function' | '.type':
+					if self.instructions[i + 1].name != 'START':
+						raise untranslatable(op)
+					self.emit(level, 'task.path = {0}'.format(i + 1))
+					self.call(i, level)
+				case '.event':
+					if self.instructions[self.ends[i + 1] + 1].name != 'EVENT':
+						raise untranslatable(op)
+					self.emit(level, 'task.path = {0}'.format(i + 1))
+					self.call(i, level)
+				case '.loop' | '.continue' if loop:
+					self.emit(level, 'continue')
+					break
+				case '.break' if loop:
+					for slot in op.slots: # Sanitise registers
+						self.emit(level, 'values[{0}] = None'.format(slot))
+					self.emit(level, 'break')
+					break # Rest of block is unreachable
+				case '.constraint':
+					self.call(i, level)
+					self.emit(level, 'if not task.path:')
+					self.emit(level + 1, 'return value')
+				case 'return':
+					self.call(i, level)
+					self.emit(level, 'return value')
+					break
+				case name if name in UNTRANSLATABLE:
+					raise untranslatable(op)
+				case '.loop' | '.continue' | '.break' | '.next' | 'if':
+					raise untranslatable(op)
+				case _:
+					self.call(i, level)
+			i = self.skip(i)
+		if len(self.lines) == lines:
+			self.emit(level, 'pass')
+
+	def chain(
+		self,
+		start: int,
+		level: int,
+		loop: bool
+		) -> int:
+		"""
+		Translates a block and the else branches that follow it.
+		"""
+		blocks, i = [], start
+		while True:
+			blocks.append((i, self.ends[i]))
+			i = self.ends[i] + 1
+			if i >= len(self.instructions) or self.instructions[i].name != 'ELSE':
+				break
+		self.block(blocks, level, loop)
+		return i
+
+	def block(
+		self,
+		blocks: list[tuple[int, int]],
+		level: int,
+		loop: bool
+		) -> None:
+		"""
+		Translates the first block of a chain and recurses on the rest.
+		"""
+		if not blocks:
+			return
+		(start, end), blocks = blocks[0], blocks[1:]
+		last = self.instructions[end - 1]
+		branch = self.condition(start + 1, end)
+		if last.name == '.loop' and self.instructions[start + 1].name == '.next': # For loop
+			op = self.instructions[start + 1]
+			(iterator,), address = op.slots, op.slot
+			flag = None
+			if blocks: # Else branches only run when the loop breaks
+				self.flags = self.flags + 1
+				flag = 'done{0}'.format(self.flags)
+				self.emit(level, '{0} = False'.format(flag))
+			self.emit(level, 'while True:')
+			self.emit(level + 1, 'try:')
+			self.emit(level + 2, 'values[{0}] = next(values[{1}])'.format(address, iterator))
+			self.emit(level + 2, 'types[{0}] = types[{1}]'.format(address, iterator))
+			self.emit(level + 1, 'except StopIteration:')
+			self.emit(level + 2, 'values[{0}] = None'.format(iterator))
+			if flag:
+				self.emit(level + 2, '{0} = True'.format(flag))
+			self.emit(level + 2, 'break')
+			self.sequence(start + 2, end - 1, level + 1, True)
+			if flag:
+				self.emit(level, 'if not {0}:'.format(flag))
+				self.block(blocks, level + 1, loop)
+		elif last.name == '.loop' and branch is not None: # While loop
+			self.emit(level, 'while True:')
+			self.sequence(start + 1, branch, level + 1, True)
+			self.test(branch, level + 1)
+			self.emit(level + 1, 'if task.path != {0}:'.format(branch + 1))
+			self.emit(level + 2, 'break')
+			self.sequence(branch + 1, end - 1, level + 1, True)
+			self.block(blocks, level, loop)
+		elif last.name == '.loop': # Loop whose condition is always true
+			self.emit(level, 'while True:')
+			self.sequence(start + 1, end - 1, level + 1, True)
+			self.block(blocks, level, loop)
+		elif branch is not None: # If statement
+			if not (last.name == 'if' and not last.args):
+				raise untranslatable(last)
+			self.sequence(start + 1, branch, level, loop)
+			self.test(branch, level)
+			self.emit(level, 'if task.path == {0}:'.format(branch + 1))
+			self.sequence(branch + 1, end - 1, level + 1, loop)
+			if blocks:
+				self.emit(level, 'else:')
+				self.block(blocks, level + 1, loop)
+		elif self.instructions[start].name == 'ELSE': # Else statement
+			self.sequence(start + 1, end, level, loop)
+			self.block(blocks, level, loop)
+		else:
+			raise untranslatable(self.instructions[start])
+
+	def test(
+		self,
+		i: int,
+		level: int
+		) -> None:
+		"""
+		Dispatches a conditional branch, which moves the path if it fails.
+		"""
+		if self.instructions[i].target is None:
+			raise untranslatable(self.instructions[i])
+		self.emit(level, 'task.path = {0}'.format(i + 1))
+		self.call(i, level)
+
+	def call(
+		self,
+		i: int,
+		level: int
+		) -> None:
+		"""
+		Dispatches an instruction.
+		Any call may run user code that restores a copy of the frame, so the
+		frame is reloaded afterwards. A tail call replaces the routine, so the
+		generated function returns to let the caller run its replacement.
+		Calls that may enter a routine or suspend the task set the path, which
+		the caller saves and a resumed task continues from.
+		"""
+		op = self.instructions[i]
+		self.names['op{0}'.format(i)] = op
+		signature = ', '.join('types[{0}]'.format(slot) for slot in op.slots)
+		if op.name in self.interns or op.name in ('if', 'return'):
+			self.emit(level, 'task.op, task.signature = op{0}, [{1}]'.format(i, signature))
+		else:
+			self.emit(level, 'task.op, task.path, task.signature = op{0}, {1}, [{2}]'.format(i, i + 1, signature))
+		args = ''.join(', values[{0}]'.format(slot) for slot in op.slots)
+		if (handler := self.interns.get(op.name)): # Internal instructions
+			self.names[handler.__name__] = handler
+			self.emit(level, 'value = {0}(task{1})'.format(handler.__name__, args))
+		elif op.name in ('if', 'return'): # Neither can run user code
+			self.emit(level, 'value = values[{0}](task{1})'.format(op.routine, args))
+			return
+		else:
+			self.emit(level, 'value = values[{0}](task{1})'.format(op.routine, args))
+			self.emit(level, 'if task.caller is not frame: # Entered user routine')
+			self.emit(level + 1, 'value = descend(task)')
+			if op.tail:
+				self.emit(level, 'elif task.path == 1: # Tail call replaced the routine')
+				self.emit(level + 1, 'return value')
+		self.emit(level, 'values, types = task.values, task.types')
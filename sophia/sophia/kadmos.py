@@ -1,9 +1,17 @@
+import hashlib
+import os
+import pickle
 import re
+import sys
+from functools import cache
+from typing import Iterator
 
+from .datatypes import aletheia, mathos
 from .hemera import handler
 from .internal import expressions, presets, statements
 from .internal.instructions import instruction
 from .internal.nodes import node
+from .stdlib import arche
 
 class parser:
 	"""
@@ -22,137 +30,236 @@ class parser:
 		self.constant = 1 # Constant register counter
 		self.instructions = [instruction('START', label = [name])]
 		self.values = {'0': None, '-1': None} # Register namespace
+		self.types = {} # Types of folded constants
 		self.handler = handler # Error handler
 
 	def parse(
 		self,
-		source: str
-		) -> tuple[list[instruction], dict]:
-		
+		source: str,
+		expression: bool = False
+		) -> tuple[list[instruction], dict, dict]:
+		"""
+		Returns the instructions, the register namespace, and its types.
+		If expression is set, the routine returns the value of its head node.
+		"""
 		if re.fullmatch(presets.REGEX_EMPTY, source):
 			raise SystemExit # End immediately without error
-		if not self.matched(source):
-			self.handler.error('SNTX', 'unmatched parentheses')
-		if not self.balanced(source):
-			self.handler.error('SNTX', 'unmatched quotes')
-		lines = self.split(source)
+		lines = self.scan(source) # Lines are tokenised as they are scanned
 		tokens = self.tokenise(lines)
 		ast = self.link(tokens)
 		instructions, namespace = self.generate()
+		if expression and not instructions[-2].args: # Expression return
+			instructions[-2].args = ['1'] if instructions[1:-2] else ['-2'] # Register of the head node
+			instructions[-2].arity = 1
+			instructions[-2].resolve()
+		self.fold()
+		instructions = self.ranges()
 		if 'tree' in self.handler.flags:
 			ast.debug() # Here's tree
-		return instructions, namespace
+		types = {k: aletheia.infer(v) for k, v in namespace.items()} | self.types
+		return instructions, namespace, types
 
-	def split(
+	def scan(
 		self,
 		source: str
-		) -> list[str]:
+		) -> Iterator[tuple[int, int, list[tuple[str, str, int]]]]:
 		"""
-		Uncomments and splits the source into logical lines.
+		Tokenises the source in a single pass, yielding each logical line
+		as it is completed, with the number of the line that it starts on,
+		its scope, and its tokens. Every token holds its kind, its value,
+		and the number of its line.
+		Quotes are matched and brackets balanced, comments are removed,
+		aliases are replaced with their canonical forms, and a line that
+		ends in a comma, semicolon or opening bracket continues onto the
+		next line.
 		"""
-		source = re.sub(presets.REGEX_COMMENT, '\n', source)
-		source = re.sub(presets.REGEX_ALIAS, self.alias, source)
-		line = ''
-		lines = []
-		for symbol in re.finditer(presets.REGEX_SPLIT, source):
+		line, stack = [], []
+		number, start, scope = 1, 1, 1
+		for symbol in re.finditer(presets.REGEX_TOKEN, source):
 			value = symbol.group()
-			match symbol.lastgroup:
-				case 'trailing': # Lookbehind seems to work just fine with re.finditer
+			kind = symbol.lastgroup
+			match kind:
+				case 'newline':
+					number = number + 1
+					if line and line[-1][1][-1] in presets.TRAILING: # Join with the next line
+						continue
+					if line:
+						yield start, scope, line
+					line, start, scope = [], number, 1
+					continue
+				case 'space':
+					if not line: # Indentation
+						scope = value.count('\t') + 1
 					continue
-				case 'final':
-					lines.append(line)
-					line = ''
-				case 'line':
-					line = line + value
-				case _:
-					self.handler.error('SNTX', value)
-		return lines
+				case 'comment':
+					continue
+				case 'unmatched':
+					self.handler.error('SNTX', 'unmatched quotes')
+				case 'literal':
+					value = presets.ALIASES.get(value, value)
+				case 'l_parens':
+					stack.append(value)
+				case 'r_parens':
+					if not stack or value != presets.PARENS[stack.pop()]:
+						self.handler.error('SNTX', 'unmatched parentheses')
+			line.append((kind, value, number))
+		if stack:
+			self.handler.error('SNTX', 'unmatched parentheses')
+		if line:
+			yield start, scope, line
 
 	def tokenise(
 		self,
-		lines: list[str]
-		) -> list[node] | None:
+		lines: Iterator[tuple[int, int, list[tuple[str, str, int]]]]
+		) -> list[node]:
 		"""
-		Regex tokenises the source, returning logical lines of tokens.
+		Builds a statement from each logical line, as it is scanned.
 		Functions as an LL(1) parser, since the current and last symbols
 		provide sufficient context to deterministically tokenise any valid
 		Sophia program.
 		"""
 		tokens = []
-		scope, branch = 1, False
-		for line in lines:
-			for symbol in re.finditer(presets.REGEX_STATEMENT, line):
-				value = symbol.group()
-				match symbol.lastgroup:
-					case 'sentinel':
-						scope, branch = 1, False
-						continue
-					case 'space':
-						continue
-					case 'indent':
-						scope = value.count('\t') + 1
-						continue
-					case 'else':
-						branch = True
-						token = statements.else_statement()
-					case 'branch':
-						branch = True
-						continue
-					case 'continue':
-						token = expressions.keyword_continue(value)
-					case 'break':
-						token = expressions.keyword_break(value)
-					case 'if':
-						token = statements.if_statement(value)
-					case 'while':
-						token = statements.while_statement(value)
-					case 'for':
-						token = statements.for_statement(value)
-					case 'return':
-						token = statements.return_statement(value)
-					case 'link':
-						token = statements.link_statement(value)
-					case 'use':
-						token = statements.use_statement(value)
-					case 'start':
-						token = statements.start_statement()
-					case 'type':
-						token = statements.type_statement(value)
-					case 'event':
-						token = statements.event_statement(value)
-					case 'function':
-						token = statements.function_statement(value)
-					case 'assign':
-						token = statements.assignment(value)
-					case 'expression':
-						token = expressions.lexer(value).parse()
-					case _:
-						self.handler.error('SNTX', value)
-				token.scope = scope
-				token.branch = branch
-				tokens.append(token)
+		for number, scope, line in lines:
+			branch = line[0][1] == 'else' and len(line) > 1
+			while line[0][1] == 'else' and len(line) > 1 and line[1][1] != ':':
+				line = line[1:]
+			token = self.statement(line)
+			token.scope = scope
+			token.branch = branch
+			token.line = number
+			tokens.append(token)
 		return tokens
 
+	def statement(
+		self,
+		tokens: list[tuple[str, str, int]]
+		) -> node:
+		"""
+		Classifies a logical line by its first token and by the symbols that
+		delimit its header. Lines that are not statements are expressions.
+		"""
+		values = [i[1] for i in tokens]
+		kinds = [i[0] for i in tokens]
+		match values:
+			case ['else', ':']:
+				return statements.else_statement()
+			case ['continue']:
+				return expressions.keyword_continue('continue')
+			case ['break']:
+				return expressions.keyword_break('break')
+			case ['if', _, *_, ':']:
+				return statements.if_statement(tokens)
+			case ['while', _, *_, ':']:
+				return statements.while_statement(tokens)
+			case ['for', _, 'in', _, *_, ':'] | ['for', _, _, 'in', _, *_, ':'] if kinds[1] == kinds[values.index('in') - 1] == 'literal':
+				return statements.for_statement(tokens)
+			case ['return', *_]:
+				return statements.return_statement(tokens)
+			case ['link', _, *_] if self.names(tokens[1:]):
+				return statements.link_statement(tokens)
+			case ['use', _, *_, 'from', _] if self.names(tokens[1:-2]) and kinds[-1] == 'literal':
+				return statements.use_statement(tokens)
+			case ['use', _, *_] if self.names(tokens[1:]):
+				return statements.use_statement(tokens)
+			case ['start', ':']:
+				return statements.start_statement()
+			case ['type', _, *_] if kinds[1] == 'literal' and self.definition(values):
+				return statements.type_statement(tokens)
+			case [_, 'awaits', *_] | [_, _, 'awaits', *_] if self.signature(tokens, values.index('awaits') + 1):
+				return statements.event_statement(tokens)
+			case [_, '(', *_] | [_, _, '(', *_] if self.signature(tokens, 0):
+				return statements.function_statement(tokens)
+			case [_, ':', _, *_] | [_, _, ':', _, *_] if self.binds(tokens):
+				return statements.assignment(tokens)
+			case _:
+				return expressions.lexer(tokens).parse()
+
+	def names(
+		self,
+		tokens: list[tuple[str, str, int]]
+		) -> bool:
+		"""
+		Checks that tokens are names separated by commas.
+		"""
+		return len(tokens) % 2 == 1 \
+			   and all(i[0] == 'literal' for i in tokens[::2]) \
+			   and all(i[1] == ',' for i in tokens[1::2])
+
+	def definition(
+		self,
+		values: list[str]
+		) -> bool:
+		"""
+		Checks the header of a type definition after its name, which is an
+		optional supertype and prototype followed by a colon or an arrow.
+		"""
+		rest = values[4:] if values[2:3] == ['extends'] else values[2:]
+		if rest[:1] == ['with']:
+			return values[-1] == ':' or '=>' in rest[1:-1]
+		return rest == [':'] or (rest[:1] == ['=>'] and len(rest) > 1)
+
+	def signature(
+		self,
+		tokens: list[tuple[str, str, int]],
+		start: int
+		) -> bool:
+		"""
+		Checks the signature of a routine definition from start, which is an
+		optional type and a name followed by a parameter list, and then by a
+		colon or an arrow.
+		"""
+		values = [i[1] for i in tokens]
+		if '(' not in values[start + 1:start + 3]:
+			return False
+		i = values.index('(', start)
+		if ')' not in values[i:] or any(kind not in ('literal', 'operator') for kind, value, line in tokens[start:i]):
+			return False
+		j = values.index(')', i)
+		rest = values[j + 1:]
+		return expressions.parameters(tokens[i + 1:j]) is not None \
+			   and (rest == [':'] or (rest[:1] == ['=>'] and len(rest) > 1))
+
+	def binds(
+		self,
+		tokens: list[tuple[str, str, int]]
+		) -> bool:
+		"""
+		Checks that each assignment of a line, separated by semicolons, has
+		a name that may be preceded by a type.
+		"""
+		for group in statements.split(tokens, ';'):
+			values = [i[1] for i in group[:3]]
+			if ':' not in values[1:3]:
+				return False
+			i = values.index(':', 1)
+			if len(group) == i + 1 or any(kind != 'literal' for kind, value, line in group[:i]):
+				return False
+		return True
+
 	def link(
 		self,
 		lines: list[node]
 		) -> statements.module:
 		"""
 		Links logical lines to create an AST.
+		The last line at each level of indentation is held in a stack, so
+		that the head of a line is found in constant time when exiting scope.
 		"""
 		head, last = self.head, self.head # Head token and last line
-		for i, line in enumerate(lines): # Group lines based on scope
+		stack = [self.head] # Last line at each scope
+		for line in lines: # Group lines based on scope
 			if line.scope > head.scope + 1: # If entering scope
 				head = last # Last line becomes the head node
 			elif line.scope < head.scope + 1: # If exiting scope
 				if line.scope > 1: # If statement is in local scope:
-					for n in lines[i::-1]: # Find the last line containing the current line in its direct scope, searching backwards from the current line
-						if n.scope == line.scope - 1: # If such a line is found:
-							head = n # Make it the head node
-							break
+					if line.scope - 1 < len(stack) and stack[line.scope - 1]: # Last line containing the current line in its direct scope
+						head = stack[line.scope - 1]
 				else: # If statement is in global scope:
 					head = self.head # Resets head to main node
 			head.nodes.append(line) # Link nodes
+			if line.scope >= len(stack):
+				stack.extend([None] * (line.scope + 1 - len(stack)))
+			stack[line.scope] = line
 			last = line
 		return self.head
 
@@ -198,6 +305,182 @@ class parser:
 		self.instructions.append(instruction('END'))
 		return self.instructions, self.values
 
+	def fold(
+		self
+		) -> list[instruction]:
+		"""
+		Evaluates operators on constant registers at compile time, then
+		eliminates the branches of conditions that are constant.
+		A folded result is interned as a new constant register, which
+		replaces the temporary register wherever it is read.
+		"""
+		folded = set()
+		for i, op in enumerate(self.instructions):
+			if not (op.name in presets.FOLDABLE and op.address.isdigit() and op.args):
+				continue
+			if not all(self.interned(arg) for arg in op.args):
+				continue
+			signature = [self.types[arg] if arg in self.types else aletheia.infer(self.values[arg]) for arg in op.args]
+			instance = arche.stdvalues[op.name].resolve(signature)
+			if instance is None: # Dispatch error is raised at runtime
+				continue
+			try:
+				value = instance.routine(None, *[self.values[arg] for arg in op.args])
+			except (ArithmeticError, TypeError, ValueError): # As are errors in the operation
+				continue
+			if (uses := self.uses(i)) is None:
+				continue
+			if value is None: # Null value is interned
+				index = '-1'
+			else: # Result has the same type as it would at runtime
+				self.constant = self.constant + 1
+				index = str(-self.constant)
+				self.values[index] = value
+				final = instance.final
+				self.types[index] = final if final.types else aletheia.infer(value)
+			for use in uses:
+				use.args = [index if arg == op.address else arg for arg in use.args]
+				if use.name == '.record':
+					use.label = [index if key == op.address else key for key in use.label]
+				use.resolve()
+			folded.add(i)
+		instructions = [op for i, op in enumerate(self.instructions) if i not in folded]
+		pruned = self.prune(instructions)
+		self.handler.debug_fold(len(folded), len(instructions) - len(pruned))
+		self.instructions = pruned
+		return pruned
+
+	def ranges(
+		self
+		) -> list[instruction]:
+		"""
+		Range literals that are only iterated over are kept as slices,
+		since a for loop never needs the materialised list.
+		The slice that the range literal is built from is overwritten by it,
+		so it is removed.
+		"""
+		removed = set()
+		for i, op in enumerate(self.instructions):
+			if op.name == '.range' and op.address.isdigit():
+				last = self.instructions[i - 1]
+				if last.name == '.slice' and last.address == op.address and last.args == op.args:
+					removed.add(i - 1)
+				uses = self.uses(i)
+				if uses and all(use.name == '.iterator' for use in uses):
+					op.name = '.slice'
+					op.resolve()
+		self.instructions = [op for i, op in enumerate(self.instructions) if i not in removed]
+		return self.instructions
+
+	def uses(
+		self,
+		start: int
+		) -> list[instruction] | None:
+		"""
+		Gets the instructions that read the return address of the instruction
+		at start before the address is next written.
+		Returns None if the address is read after a label, since another write
+		could reach the read through a loop.
+		The walk stops at the next write, so folding stays linear in the
+		length of the module; temporary registers are rewritten within a
+		few instructions.
+		"""
+		instructions = self.instructions
+		address = instructions[start].address
+		uses, jumped = [], False
+		for i in range(start + 1, len(instructions)):
+			op = instructions[i]
+			if not op.address:
+				jumped = jumped or op.name in ('START', 'ELSE', 'END', 'EVENT')
+				continue
+			if address in op.args or (op.name == '.record' and address in op.label):
+				if jumped:
+					return None
+				uses.append(op)
+			if op.address == address or (op.name == '.bind' and address in op.label):
+				break
+		return uses
+
+	def interned(
+		self,
+		register: str
+		) -> bool:
+		"""
+		Checks if a register is a constant register.
+		"""
+		return register[0] == '-' and register in self.values
+
+	def prune(
+		self,
+		instructions: list[instruction]
+		) -> list[instruction]:
+		"""
+		Eliminates the branches of blocks whose condition is a constant.
+		The block structure of the result remains valid, so that a branch
+		that becomes the first of its chain is opened with START.
+		"""
+		ends, stack = {}, []
+		for i, op in enumerate(instructions):
+			if not op.address:
+				if op.name == 'END':
+					ends[stack.pop()] = i
+				elif op.name in ('START', 'ELSE', 'EVENT'):
+					stack.append(i)
+
+		def condition(start: int, end: int) -> int | None: # Conditional branch of a block
+			i = start
+			while i < end:
+				if instructions[i].name == 'if' and instructions[i].args:
+					return i
+				i = ends[i] + 1 if i in ends else i + 1
+
+		def sequence(start: int, end: int) -> list[instruction]:
+			result, i = [], start
+			while i < end:
+				op = instructions[i]
+				if i in ends and op.name == 'START':
+					blocks = []
+					while i < end and (not blocks or instructions[i].name == 'ELSE'):
+						blocks.append((i, ends[i]))
+						i = ends[i] + 1
+					result.extend(chain(blocks, True))
+				elif i in ends: # Other labelled blocks are kept whole
+					result.extend([op] + sequence(i + 1, ends[i]) + [instructions[ends[i]]])
+					i = ends[i] + 1
+				else:
+					result.append(op)
+					i = i + 1
+			return result
+
+		def chain(blocks: list[tuple[int, int]], first: bool) -> list[instruction]:
+			if not blocks:
+				return []
+			(start, end), blocks = blocks[0], blocks[1:]
+			head = instructions[start]
+			if first and head.name == 'ELSE':
+				head = instruction('START')
+			loop = instructions[end - 1].name == '.loop'
+			branch = condition(start + 1, end)
+			value = self.values[instructions[branch].args[0]] if branch is not None and self.interned(instructions[branch].args[0]) else None
+			if type(value) is not bool:
+				if first and branch is None and not loop and instructions[start].name == 'ELSE': # Else branch is always taken
+					return sequence(start + 1, end) + chain(blocks, False)
+				return [head] + sequence(start + 1, end) + [instructions[end]] + chain(blocks, False)
+			before = sequence(start + 1, branch) # Instructions of the condition
+			if value and loop: # Loop only exits by breaking
+				return [head] + before + sequence(branch + 1, end) + [instructions[end]] + chain(blocks, False)
+			elif value: # Remaining branches are unreachable
+				body = before + sequence(branch + 1, end - 1)
+				return body if first else [head] + body + [instructions[end]]
+			elif first: # Branch is unreachable
+				return before + chain(blocks, True)
+			elif not before:
+				return chain(blocks, False)
+			else: # Instructions of the condition cannot be moved out of the chain
+				return [head] + sequence(start + 1, end) + [instructions[end]] + chain(blocks, False)
+
+		return sequence(0, len(instructions))
+
 	def register(
 		self
 		) -> str:
@@ -221,61 +504,84 @@ class parser:
 		elif isinstance(self.node, expressions.literal): # Constant register
 			self.constant = self.constant + 1
 			index = str(-self.constant)
-			self.values[index] = self.node.value
+			self.values[index] = mathos.machine(self.node.value, self.handler.flags)
 			return index
 		else: # Temporary register
 			index = str(sum(self.path) + 1) # Sum of path is a pretty good way to minimise registers
 			self.values[index] = None
 			return index
-			
-	def balanced(
-		self,
-		string: str
-		) -> bool:
-		"""
-		Takes a string and checks if its parentheses are balanced.
-		This check permits parentheses over newlines.
-		https://stackoverflow.com/questions/6701853/parentheses-pairing-issue
-		"""
-		stack = []
-		for symbol in re.finditer(presets.REGEX_BALANCED, string):
-			value = symbol.group()
-			match symbol.lastgroup:
-				case 'string':
-					continue
-				case 'l_parens': # If character is an opening parenthesis:
-					stack.append(value) # Add to stack
-				case 'r_parens': # If character is a closing parenthesis:
-					if not stack or value != presets.PARENS[stack.pop()]: # If the stack is empty or c doesn't match the item popped off the stack:
-						return False # Parentheses are unbalanced
-		return not stack # Interprets stack as a boolean, where an empty stack is falsy
-		
-	def matched(
-		self,
-		string: str
-		) -> bool:
-		"""
-		Takes a string and checks if its quotes are matched.
-		This check does not permit quotes over newlines.
-		"""
-		for symbol in re.finditer(presets.REGEX_MATCHED, string, flags = re.MULTILINE):
-			match symbol.lastgroup:
-				case 'string':
-					continue
-				case 'unmatched':
-					return False
-		return True
 
-	def alias(
-		self,
-		symbol: re.Match
-		) -> str:
-		"""
-		Replaces aliases with their canonical forms.
-		"""
-		value = symbol.group()
-		match symbol.lastgroup:
-			case 'string':
-				return value
-			case 'literal':
-				return presets.ALIASES[value] if value in presets.ALIASES else value
\ No newline at end of file
+@cache
+def fingerprint() -> bytes:
+	"""
+	Hashes the source of the interpreter and the version of Python, which
+	together stand for the version of the compiler.
+	"""
+	digest = hashlib.sha256(sys.version.encode())
+	package = os.path.dirname(__file__)
+	for directory, folders, files in sorted(os.walk(package)):
+		folders[:] = [i for i in folders if i != '__pycache__']
+		for file in sorted(files):
+			if file.endswith(('.py', '.json')):
+				with open(os.path.join(directory, file), 'rb') as f:
+					digest.update(f.read())
+	return digest.digest()
+
+def load(
+	handler: handler,
+	name: str,
+	source: str,
+	path: str
+	) -> tuple[list[instruction], dict, dict]:
+	"""
+	Parses the module at path, using the bytecode cache in the __sphcache__
+	directory next to it, which is also held in memory.
+	Entries are keyed by the hash of the source, the module name, the flags
+	that change code generation, and the version of the compiler. Stale or
+	unreadable entries are rebuilt, and failures to write are ignored.
+	The cache is bypassed by the flags that print the work of the parser.
+	"""
+	if 'tree' in handler.flags or 'processor' in handler.flags: # The tree and the folding report are only available to the parser
+		return parser(handler, name).parse(source)
+	key = hashlib.sha256(fingerprint())
+	key.update('\0'.join((name, 'float' if 'float' in handler.flags else '', source)).encode())
+	key = key.digest()
+	if key in resident: # Entries are unpickled afresh, since tasks optimise their instructions in place
+		return pickle.loads(resident[key])[1]
+	directory, file = os.path.split(path)
+	cached = os.path.join(directory, '__sphcache__', file.rsplit('.', 1)[0] + '.sphc')
+	try:
+		with open(cached, 'rb') as f:
+			data = f.read()
+		entry = pickle.loads(data)
+		if entry[0] == key:
+			keep(key, data)
+			return entry[1]
+	except Exception: # Missing or corrupt entry
+		pass
+	result = parser(handler, name).parse(source)
+	data = pickle.dumps((key, result))
+	keep(key, data)
+	try:
+		os.makedirs(os.path.dirname(cached), exist_ok = True)
+		temporary = '{0}.{1}'.format(cached, os.getpid())
+		with open(temporary, 'wb') as f:
+			f.write(data)
+		os.replace(temporary, cached) # Readers never see a partial entry
+	except Exception:
+		pass
+	return result
+
+resident = {} # Entries of the bytecode cache held in memory, for processes that outlive their programs
+
+def keep(
+	key: bytes,
+	data: bytes
+	) -> None:
+	"""
+	Holds an entry of the bytecode cache in memory, evicting the oldest
+	entry if the cache is full.
+	"""
+	if len(resident) >= presets.RESIDENT_SIZE:
+		del resident[next(iter(resident))]
+	resident[key] = data
@@ -0,0 +1,458 @@
+'''
+Executors for Sophia.
+An executor runs tasks on behalf of the supervisor and carries the messages
+between them. Every executor provides the same interface: submit() schedules
+a call and returns a handle with ready() and get(), pipe() connects a task to
+its proxy, the stream carries messages from tasks to the supervisor, and
+drive() dispatches those messages until main terminates. Tasks get the stream
+from their proxies, except in worker processes, which inherit it.
+An executor outlives the programs that it runs: start() hands it to the
+supervisor of the next program, and shutdown() releases its workers.
+Tasks on threads share the standard streams of the supervisor, so only worker
+processes need to forward their output.
+'''
+import multiprocessing as mp
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, Queue, SimpleQueue
+from threading import Semaphore, Thread, local
+from typing import Any, Callable
+
+from . import hemera
+from .datatypes import iris
+
+class output:
+	"""
+	Standard stream of a worker process that forwards writes to the
+	supervisor, which writes them to its own stream of the same pid.
+	"""
+	def __init__(
+		self,
+		pid: int,
+		stream: Any
+		) -> None:
+
+		self.pid = pid
+		self.stream = stream
+
+	def write(
+		self,
+		text: str
+		) -> int:
+
+		if text:
+			self.stream.put(iris.message(self.pid, 'write', (text,)))
+		return len(text)
+
+	def flush(self) -> None: pass
+
+def initialise(
+	stream: Any,
+	forward: bool = False
+	) -> None:
+	"""
+	Initialises a worker process with a connection to the supervisor.
+	The standard library is loaded before the first task arrives.
+	"""
+	from . import task
+	mp.current_process().stream = stream
+	if forward: # Output of tasks is written by the supervisor
+		hemera.attach(sys.stdin, output(1, stream), output(2, stream))
+
+class pooled:
+	"""
+	Base executor for pools of workers.
+	The supervisor listens on the stream while the workers run tasks.
+	"""
+	def __init__(
+		self,
+		workers: int | None = None
+		) -> None:
+
+		self.supervisor = None # Runtime of the current program
+		self.workers = workers
+
+	def start(
+		self,
+		supervisor
+		) -> None:
+
+		self.supervisor = supervisor
+
+	def drive(
+		self,
+		interval: float | None = None
+		) -> None:
+		"""
+		Event listener; runs until the null sentinel value sent from the
+		termination of main.
+		"""
+		while True:
+			try:
+				message = self.stream.get(timeout = interval)
+			except Empty:
+				self.supervisor.handler.timeout() # Prints timeout warning
+				continue
+			if not message:
+				break
+			self.supervisor.dispatch(message)
+
+class processes(pooled):
+	"""
+	Runs tasks on a pool of worker processes.
+	Tasks and messages are pickled on their way to and from the workers.
+	The output of the workers may be forwarded to the supervisor, such as
+	when the standard streams of the supervisor are redirected.
+	"""
+	def __init__(
+		self,
+		workers: int | None = None,
+		forward: bool = False
+		) -> None:
+
+		super().__init__(workers)
+		self.stream = mp.Queue() # Supervisor message stream
+		self.pool = mp.Pool(workers, initializer = initialise, initargs = (self.stream, forward))
+		self.pipe = mp.Pipe
+
+	def submit(
+		self,
+		function: Callable,
+		*args: tuple
+		) -> Any:
+
+		return self.pool.apply_async(function, args)
+
+	def shutdown(self) -> None:
+
+		self.pool.close()
+		self.pool.join()
+
+class pending:
+	"""
+	Handle for the return value of a call on a thread.
+	"""
+	def __init__(
+		self,
+		future: Future
+		) -> None:
+
+		self.future = future
+
+	def ready(self) -> bool: return self.future.done()
+
+	def get(self) -> Any: return self.future.result()
+
+class connection:
+	"""
+	One end of an in-memory pipe between threads.
+	"""
+	def __init__(
+		self,
+		inbox: SimpleQueue,
+		outbox: SimpleQueue
+		) -> None:
+
+		self.inbox, self.outbox = inbox, outbox
+
+	def send(
+		self,
+		value: Any
+		) -> None:
+
+		self.outbox.put(value)
+
+	def recv(self) -> Any: return self.inbox.get()
+
+class threads(pooled):
+	"""
+	Runs tasks on a pool of threads in the supervisor's process.
+	Values are shared between tasks instead of being pickled. Under a
+	free-threaded build of CPython, the threads run in parallel.
+	"""
+	def __init__(
+		self,
+		workers: int | None = None,
+		forward: bool = False
+		) -> None:
+
+		super().__init__(workers)
+		self.stream = Queue() # Supervisor message stream
+		self.pool = ThreadPoolExecutor(workers)
+
+	def pipe(self) -> tuple[connection, connection]:
+
+		a, b = SimpleQueue(), SimpleQueue()
+		return connection(a, b), connection(b, a)
+
+	def submit(
+		self,
+		function: Callable,
+		*args: tuple
+		) -> pending:
+
+		return pending(self.pool.submit(function, *args))
+
+	def shutdown(self) -> None:
+
+		self.pool.shutdown()
+
+class result:
+	"""
+	Handle for the return value of a call on the serial executor.
+	"""
+	def __init__(
+		self,
+		executor
+		) -> None:
+
+		self.executor = executor
+		self.done = False
+		self.value = None
+
+	def ready(self) -> bool: return self.done
+
+	def get(self) -> Any:
+		"""
+		Gets the return value, running other tasks until it is available.
+		"""
+		self.executor.wait(self.ready)
+		return self.value
+
+class channel:
+	"""
+	One end of an in-memory pipe on the serial executor.
+	A task that waits on an empty channel yields until a value arrives.
+	"""
+	def __init__(
+		self,
+		executor
+		) -> None:
+
+		self.executor = executor
+		self.buffer = deque()
+		self.other = None # Opposite end of the pipe
+
+	def send(
+		self,
+		value: Any
+		) -> None:
+
+		self.other.buffer.append(value)
+
+	def recv(self) -> Any:
+
+		self.executor.wait(lambda: self.buffer)
+		return self.buffer.popleft()
+
+class abandoned(BaseException):
+	"""
+	Unwinds a continuation that is left waiting at the end of a program.
+	"""
+
+class continuation:
+	"""
+	Thread that runs calls for the serial executor.
+	Control passes between the loop and its continuations like a baton, so
+	that only one of them runs at a time. A continuation that waits hands the
+	baton back to the loop and keeps its stack until its condition holds.
+	"""
+	def __init__(
+		self,
+		executor
+		) -> None:
+
+		self.executor = executor
+		self.baton = Semaphore(0)
+		self.call = None # Handle, function, and arguments of the current call
+		self.condition = None # Condition that the continuation waits on
+		self.error = None # Exception raised by the current call
+		self.abandoned = False
+		Thread(target = self.main, daemon = True).start()
+
+	def main(self) -> None:
+
+		executor = self.executor
+		executor.local.continuation = self
+		while True:
+			self.baton.acquire()
+			if self.call is None: # Released by shutdown()
+				return
+			(handle, function, args), self.call = self.call, None
+			try:
+				handle.value = function(*args)
+				handle.done = True
+			except abandoned:
+				executor.baton.release()
+				return
+			except BaseException as e: # Raised in the loop instead
+				self.error = e
+			executor.idle.append(self)
+			executor.baton.release()
+
+	def suspend(
+		self,
+		condition: Callable
+		) -> None:
+		"""
+		Hands the baton back to the loop until the condition holds.
+		"""
+		self.condition = condition
+		self.executor.waiting.append(self)
+		self.executor.baton.release()
+		self.baton.acquire()
+		if self.abandoned:
+			raise abandoned
+
+class serial:
+	"""
+	Runs tasks as cooperative coroutines of an event loop in the
+	supervisor's process. The executor is its own stream: calls submitted
+	to it are run in order, and the messages that tasks send are dispatched
+	to the supervisor between calls.
+	Each call runs as a continuation, so that a task that cannot suspend
+	waits by yielding to the loop until its reply arrives, and the loop
+	checks every waiting task before it reports a deadlock.
+	"""
+	def __init__(
+		self,
+		workers: int | None = None,
+		forward: bool = False
+		) -> None:
+
+		self.supervisor = None # Runtime of the current program
+		self.calls = deque() # Calls that are ready to run
+		self.messages = deque() # Messages awaiting the supervisor
+		self.waiting = [] # Continuations that wait on a condition
+		self.idle = [] # Continuations that are free to run a call
+		self.closed = False # Set by the termination of main
+		self.baton = Semaphore(0) # Held by the loop while it runs
+		self.local = local() # Continuation of the current thread
+		self.stream = self
+
+	def start(
+		self,
+		supervisor
+		) -> None:
+		"""
+		Tasks left over from the previous program are dropped.
+		"""
+		self.supervisor = supervisor
+		self.abandon()
+		self.calls.clear()
+		self.messages.clear()
+		self.closed = False
+
+	def abandon(self) -> None:
+		"""
+		Unwinds the continuations that are still waiting.
+		"""
+		while self.waiting:
+			task = self.waiting.pop()
+			task.abandoned = True
+			self.switch(task)
+
+	def put(
+		self,
+		message: Any
+		) -> None:
+		"""
+		Stream interface for task.message().
+		"""
+		if message is None:
+			self.closed = True
+		else:
+			self.messages.append(message)
+
+	def pipe(self) -> tuple[channel, channel]:
+
+		a, b = channel(self), channel(self)
+		a.other, b.other = b, a
+		return a, b
+
+	def submit(
+		self,
+		function: Callable,
+		*args: tuple
+		) -> result:
+
+		handle = result(self)
+		self.calls.append((handle, function, args))
+		return handle
+
+	def switch(
+		self,
+		task: continuation
+		) -> None:
+		"""
+		Passes the baton to a continuation until it finishes or waits.
+		"""
+		task.baton.release()
+		self.baton.acquire()
+		if task.error:
+			error, task.error = task.error, None
+			raise error
+
+	def step(self) -> bool:
+		"""
+		Dispatches the next message, or resumes a continuation whose
+		condition holds, or runs the next call. Returns False if there is
+		nothing left to do.
+		"""
+		if self.messages:
+			self.supervisor.dispatch(self.messages.popleft())
+		elif (task := next((i for i in self.waiting if i.condition()), None)):
+			self.waiting.remove(task)
+			task.condition = None
+			self.switch(task)
+		elif self.calls:
+			task = self.idle.pop() if self.idle else continuation(self)
+			task.call = self.calls.popleft()
+			self.switch(task)
+		else:
+			return False
+		return True
+
+	def wait(
+		self,
+		condition: Callable
+		) -> None:
+		"""
+		Waits until the condition holds. A continuation yields to the loop,
+		and the supervisor runs the loop itself; a loop that runs out of work
+		first has deadlocked.
+		"""
+		if condition():
+			return
+		if (task := getattr(self.local, 'continuation', None)):
+			return task.suspend(condition)
+		while not condition():
+			if not self.step():
+				raise RuntimeError('deadlock')
+
+	def drive(
+		self,
+		interval: float | None = None
+		) -> None:
+
+		self.wait(lambda: self.closed)
+
+	def shutdown(self) -> None:
+
+		self.abandon()
+		while self.idle:
+			self.idle.pop().baton.release()
+
+executors = { # Executors selected by flag; processes are the default
+	'serial': serial,
+	'threads': threads
+}
+
+def select(
+	flags: tuple[str, ...]
+	) -> type:
+	"""
+	Gets the executor selected by the given flags.
+	"""
+	return next((executors[i] for i in flags if i in executors), processes)
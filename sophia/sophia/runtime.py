@@ -2,11 +2,11 @@
 
 import multiprocessing as mp
 import os
-from queue import Empty
-from typing import Any
+from typing import Any, Self
 
-from . import hemera, kadmos
+from . import hemera, kadmos, kairos
 from .datatypes import aletheia, iris
+from .internal import registers
 from .task import task
 
 class runtime:
@@ -20,18 +20,22 @@ class runtime:
 		self,
 		address: str,
 		*flags: tuple[str, ...],
-		root: str = 'user'
+		root: str = 'user',
+		workers: int | None = None,
+		host: 'host | None' = None,
+		source: str | None = None
 		) -> None:
 		"""
-		Set MP context and read the source file.
+		Set MP context and read the source file, unless the source is given.
 		"""
 		mp.freeze_support()
 		try:
 			mp.set_start_method('spawn' if os.name == 'nt' else 'fork')
 		except RuntimeError:
 			pass
-		with open('{0}/{1}'.format(root, address), 'r') as f:
-			source = f.read() # Binds file data to runtime object
+		if source is None:
+			with open('{0}/{1}'.format(root, address), 'r') as f:
+				source = f.read() # Binds file data to runtime object
 		try: # Yes, the handler can fault if it's given unknown flags
 			self.handler = hemera.handler(source, flags)
 		except SystemExit:
@@ -40,10 +44,10 @@ class runtime:
 		"""
 		Compile stage. Yields a task object containing optimised instructions.
 		"""
+		registers.reset() # Registers of earlier programs are not kept
 		try:
-			parser = kadmos.parser(self.handler, address.split('.')[0])
-			instructions, namespace = parser.parse(source)
-			self.main = task(self.handler, instructions, namespace).analyse() # Initial task
+			instructions, namespace, types = kadmos.load(self.handler, address.split('.')[0], source, '{0}/{1}'.format(root, address))
+			self.main = task(self.handler, instructions, namespace, types).analyse() # Initial task
 		except SystemExit: # Catches any compile-time error
 			self.handler.lock = True # Lock runtime
 			return
@@ -51,18 +55,14 @@ class runtime:
 		Build the supervisor. Main task is initialised and awaiting execution.
 		"""
 		self.root = root
-		self.stream = mp.Queue() # Supervisor message stream
-		self.pool = None # Don't initialise just yet
-		self.tasks = {self.main.pid: iris.proxy(self.main)} # Proxies of tasks
+		self.workers = workers # Worker count of the executor
+		self.executor = None # Don't initialise just yet
+		self.host = host # Host that keeps the executor between programs
+		self.tasks = {} # Proxies of tasks
+		self.pids = {1, 2} # Every task of this program, and the output streams of workers
 		self.events = {} # Persistent event tasks
 		self.modules = {} # Use cache
 
-	def initialise(self) -> None:
-		"""
-		Initialises a task with a connection to the supervisor.
-		"""
-		mp.current_process().stream = self.stream
-
 	def open(
 		self,
 		address: str
@@ -73,6 +73,18 @@ class runtime:
 		with open('{0}/{1}'.format(self.root, address), 'r') as f:
 			return f.read()
 
+	def spawn(
+		self,
+		new: task
+		) -> iris.proxy:
+		"""
+		Submits a new task to the executor.
+		"""
+		self.tasks[new.pid] = proxy = iris.proxy(new, self.executor.pipe, self.executor.stream)
+		self.pids.add(new.pid)
+		proxy.result = self.executor.submit(new.execute)
+		return proxy
+
 	def future(
 		self,
 		pid: int,
@@ -82,14 +94,14 @@ class runtime:
 		) -> None:
 		
 		new = task(self.handler, method.instructions, values, types).analyse()
-		proxy = iris.proxy(new)
-		proxy.result = self.pool.apply_async(new.execute)
-		proxy.count = 1
-		self.tasks[new.pid] = proxy
+		if isinstance(method, aletheia.event_method):
+			new.suspendable = False # Events are restarted from their state on every message
+		self.spawn(new).count = 1
 		if isinstance(method, aletheia.event_method):
 			self.events[new.pid] = new # Persistent reference to event
 		self.tasks[pid].references.append(new.pid) # Mark reference to process
-		self.tasks[pid].calls.send( # Return reference to process
+		self.reply( # Return reference to process
+			pid,
 			iris.reference(method.name, new.pid, method.final, readable = True, writeable = True)
 		)
 
@@ -106,9 +118,24 @@ class runtime:
 			self.tasks[reference.pid].state = state = self.tasks[reference.pid].result.get() # Check event is finished
 			routine = self.events[reference.pid]
 			routine.prepare(state, message) # Mutate this version of the task
-			self.tasks[reference.pid].result = self.pool.apply_async(routine.execute)
+			self.tasks[reference.pid].result = self.executor.submit(routine.execute)
+		elif (proxy := self.tasks[reference.pid]).receiving:
+			proxy.receiving = False
+			self.reply(reference.pid, message)
+		else:
+			proxy.mailbox.append(message)
+
+	def receive(
+		self,
+		pid: int
+		) -> None:
+		"""
+		Messages are held by the supervisor until the task receives them.
+		"""
+		if (proxy := self.tasks[pid]).mailbox:
+			self.reply(pid, proxy.mailbox.popleft())
 		else:
-			self.tasks[reference.pid].messages.send(message)
+			proxy.receiving = True
 
 	def resolve(
 		self,
@@ -116,12 +143,22 @@ class runtime:
 		reference: iris.reference) -> None:
 		
 		if reference.pid == 0: # Standard streams
-			self.tasks[pid].calls.send(self.handler.read(reference))
-		elif self.tasks[reference.pid].result.ready():
-			self.tasks[pid].calls.send(self.tasks[reference.pid].result.get())
+			self.reply(pid, self.handler.read(reference))
+		elif self.tasks[reference.pid].ready():
+			self.reply(pid, self.tasks[reference.pid].result.get()['values']['0'])
 		else:
 			self.tasks[reference.pid].requests.append(pid) # Submit request for return value
 
+	def write(
+		self,
+		pid: int,
+		text: str
+		) -> None:
+		"""
+		Writes the forwarded output of a worker process.
+		"""
+		hemera.streams[pid].write(text)
+
 	def read(
 		self,
 		pid: int,
@@ -130,49 +167,86 @@ class runtime:
 		Multiprocessing disables input for all child processes,
 		so it has to be handled by the supervisor.
 		"""
-		self.tasks[pid].calls.send(self.handler.read(iris.std_stdin, message))
+		self.reply(pid, self.handler.read(iris.std_stdin, message))
 
 	def link(
 		self,
 		pid: int,
-		address: str
+		*addresses: tuple[str, ...]
 		) -> None:
 		
-		source = self.open(address)
-		parser = kadmos.parser(self.handler, address.split('.')[0])
-		instructions, namespace = parser.parse(source)
-		new = task(self.handler, instructions, namespace).analyse()
-		proxy = iris.proxy(new)
-		proxy.result = self.pool.apply_async(new.execute)
-		proxy.count = 1
-		self.tasks[new.pid] = proxy
-		self.tasks[pid].references.append(new.pid) # Mark reference to process
-		self.tasks[pid].calls.send( # Return reference to process
-			iris.reference(new.name, new.pid, aletheia.typedef(aletheia.std_any), readable = True, writeable = True)
-		)
+		references = []
+		for address in addresses:
+			source = self.open(address)
+			instructions, namespace, types = kadmos.load(self.handler, address.split('.')[0], source, '{0}/{1}'.format(self.root, address))
+			new = task(self.handler, instructions, namespace, types).analyse()
+			self.spawn(new).count = 1
+			self.tasks[pid].references.append(new.pid) # Mark reference to process
+			references.append(
+				iris.reference(new.name, new.pid, aletheia.typedef(aletheia.std_any), readable = True, writeable = True)
+			)
+		self.reply(pid, references) # Return references to processes
 
 	def use(
 		self,
 		pid: int,
-		name: str
+		*names: tuple[str, ...]
 		) -> None:
 
-		if name in self.modules: # Use cache
-			self.tasks[pid].calls.send(self.modules[name])
-		else:
+		self.reply(pid, [self.module(name) for name in names])
+
+	def module(
+		self,
+		name: str
+		) -> dict:
+		"""
+		Gets the routines of a module, loading it on first use.
+		"""
+		if name not in self.modules: # Use cache
 			source = self.open(name + '.sph')
-			parser = kadmos.parser(self.handler, name)
-			instructions, namespace = parser.parse(source)
-			routines = task(self.handler, instructions, namespace).analyse().use()
+			instructions, namespace, types = kadmos.load(self.handler, name, source, '{0}/{1}.sph'.format(self.root, name))
+			routines = task(self.handler, instructions, namespace, types).analyse().use()
+			closure = namespace.copy() # Shared, since routines only read their closures
 			for routine in routines.values():
 				if isinstance(routine, aletheia.typedef):
 					for item in routine.types:
-						item.closure = namespace.copy()
+						item.closure = closure
 				else:
 					for method in routine.collect():
-						method.closure = namespace.copy()
+						method.closure = closure
 			self.modules[name] = routines
-			self.tasks[pid].calls.send(self.modules[name])
+		return self.modules[name]
+
+	def suspend(
+		self,
+		pid: int,
+		state: dict,
+		instruction: str,
+		args: tuple
+		) -> None:
+		"""
+		Parks a task that suspended on a request, releasing its worker,
+		then handles the request.
+		"""
+		proxy = self.tasks[pid]
+		proxy.result, proxy.state, proxy.suspended = None, state, True
+		getattr(self, instruction)(pid, *args)
+
+	def reply(
+		self,
+		pid: int,
+		value: Any
+		) -> None:
+		"""
+		Answers the request of a task. A suspended task is resumed on the
+		next free worker.
+		"""
+		proxy = self.tasks[pid]
+		if proxy.suspended:
+			proxy.suspended = False
+			proxy.result = self.executor.submit(proxy.task.resume, proxy.state, value)
+		else:
+			proxy.calls.send(value)
 
 	def terminate(
 		self,
@@ -185,7 +259,7 @@ class runtime:
 		self.tasks[pid].state = state # Store persistent state in supervisor
 		value = state['values']['0'] # Get return value from state
 		for process in self.tasks[pid].requests:
-			self.tasks[process].calls.send(value)
+			self.reply(process, value)
 		self.tasks[pid].requests = []
 		for process in self.tasks[pid].references:
 			self.tasks[process].count = self.tasks[process].count - 1
@@ -194,7 +268,7 @@ class runtime:
 				if process in self.events: # Free events
 					del self.events[process]
 		if pid == self.main.pid:
-			self.stream.put(None) # End supervisor
+			self.executor.stream.put(None) # End supervisor
 		elif self.tasks[pid].count == 0: # Free own task
 			del self.tasks[pid]
 
@@ -206,36 +280,82 @@ class runtime:
 		if self.handler.lock:
 			return
 		self.main.handler.flags = tuple(list(self.main.handler.flags) + ['debug']) # Suppresses terminate message
+		self.main.suspendable = False # No supervisor to park the task in
 		return self.main.execute()
 
+	def dispatch(
+		self,
+		message: iris.message
+		) -> None:
+		"""
+		Executes a message from a task.
+		Messages from the tasks of earlier programs on the same host are
+		discarded.
+		"""
+		if message.pid not in self.pids:
+			return
+		if 'supervisor' in self.handler.flags:
+			self.handler.debug_supervisor(message)
+		try:
+			getattr(self, message.instruction)(message.pid, *message.args)
+		except RuntimeError:
+			self.handler.warn() # Prints task warning
+
 	def run(self) -> Any:
 		"""
-		Default runtime environment. Enables multiprocessing.
+		Default runtime environment. Enables concurrency.
+		Tasks run on a pool of processes unless another executor is
+		selected by flag, or on the executor of the host.
 		"""
 		if self.handler.lock:
 			return
-		message = True
 		interval = 10 if 'timeout' in self.handler.flags or self.root == 'harmonia' else None # Timeout interval
-		self.pool = mp.Pool(initializer = self.initialise)
+		self.executor = self.host.executor if self.host else kairos.select(self.handler.flags)(self.workers)
+		self.executor.start(self)
 		try:
-			self.tasks[self.main.pid].result = self.pool.apply_async(self.main.execute) # Start execution of initial module
-			while message: # Event listener; runs until null sentinel value sent from the termination of main
-				try:
-					message = self.stream.get(timeout = interval)
-					if not message:
-						break
-					if 'supervisor' in self.handler.flags:
-						self.handler.debug_supervisor(message)
-					try:
-						getattr(self, message.instruction)(message.pid, *message.args)
-					except RuntimeError:
-						self.handler.warn() # Prints task warning
-				except Empty:
-					self.handler.timeout() # Prints timeout warning
-					message = True
+			self.spawn(self.main) # Start execution of initial module
+			self.executor.drive(interval)
 		except SystemExit:
 			self.handler.lock = True
+		except RuntimeError:
+			self.handler.deadlock() # Prints deadlock warning
+			return None
 		finally:
-			self.pool.close()
-			self.pool.join()
-		return self.tasks[self.main.pid].result.get()['values']['0']
\ No newline at end of file
+			if not self.host:
+				self.executor.shutdown()
+		return self.tasks[self.main.pid].result.get()['values']['0']
+
+class host:
+	"""
+	Long-lived host for successive programs.
+	The host keeps the workers of its executor warm between programs, each
+	of which is run by its own runtime with its own supervisor state.
+	"""
+	def __init__(
+		self,
+		*flags: tuple[str, ...],
+		workers: int | None = None,
+		forward: bool = False
+		) -> None:
+
+		self.executor = kairos.select(flags)(workers, forward)
+
+	def run(
+		self,
+		address: str,
+		*flags: tuple[str, ...],
+		root: str = 'user',
+		source: str | None = None
+		) -> Any:
+		"""
+		Runs a program on the warm executor.
+		"""
+		return runtime(address, *flags, root = root, host = self, source = source).run()
+
+	def close(self) -> None:
+
+		self.executor.shutdown()
+
+	def __enter__(self) -> Self: return self
+
+	def __exit__(self, *exception: tuple) -> None: self.close()
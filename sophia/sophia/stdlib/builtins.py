@@ -2,12 +2,13 @@
 Built-in functions.
 '''
 import re
-from math import copysign
+from math import copysign, floor
 
 from . import casts
 from ..datatypes import aletheia
 from ..datatypes.aletheia import funcdef, typedef
-from ..datatypes.mathos import real
+from ..datatypes.mathos import machine, real
+from ..internal import registers
 from ..internal.presets import DATATYPES
 
 def abs_number(task, value):
@@ -22,7 +23,7 @@ def cast_any_type(task, value, routine):
 	
 	for item in routine.types[::-1]:
 		if item.name in DATATYPES.values():
-			return casts.cast(value, item.name)
+			return machine(casts.cast(value, item.name), task.handler.flags)
 	else:
 		return None
 #	try:
@@ -40,6 +41,8 @@ std_cast = funcdef(
 
 def ceiling_number(task, value):
 
+	if type(value) is float: # Python rounds floats to ints
+		return float(value.__ceil__())
 	return value.__ceil__() # Handled by real
 
 std_ceiling = funcdef(
@@ -75,6 +78,8 @@ std_error = funcdef(
 
 def floor_number(task, value):
 
+	if type(value) is float: # Python rounds floats to ints
+		return float(value.__floor__())
 	return value.__floor__() # Handled by real
 
 std_floor = funcdef(
@@ -94,7 +99,7 @@ def filter_function_list(task, routine, sequence):
 		return None # Verify type signature
 	for item in sequence:
 		if instance.instructions:
-			caller = task.call()
+			caller = task.call(instance.frame())
 			instance(task, item)
 			check = task.run() # WARNING: Recursive runtime
 			task.restore(caller)
@@ -115,7 +120,7 @@ std_filter = funcdef(
 
 def format_string_list(task, string, args):
 
-	return string.format(*args)
+	return str(string).format(*args)
 
 std_format = funcdef(
 	format_string_list
@@ -125,7 +130,7 @@ def hash_any(task, value):
 	"""
 	THIS HASH IS NOT CRYPTOGRAPHICALLY SECURE.
 	"""
-	return real(hash(value))
+	return machine(real(hash(value)), task.handler.flags)
 
 std_hash = funcdef(
 	hash_any
@@ -151,8 +156,7 @@ std_if = funcdef(
 
 def input_string(task, value):
 	
-	task.message('read', value)
-	return task.calls.recv()
+	return task.request('read', value)
 
 std_input = funcdef(
 	input_string
@@ -160,7 +164,7 @@ std_input = funcdef(
 
 def join_list_string(task, sequence, joiner):
 
-	return joiner.join(sequence)
+	return str(joiner).join(map(str, sequence))
 
 std_join = funcdef(
 	join_list_string
@@ -201,7 +205,7 @@ def map_function_list(task, routine, sequence):
 		return None # Verify type signature
 	for item in sequence:
 		if instance.instructions:
-			caller = task.call()
+			caller = task.call(instance.frame())
 			instance(task, item)
 			result.append(task.run()) # WARNING: Recursive runtime
 			task.restore(caller)
@@ -222,7 +226,7 @@ def namespace_none(task):
 	"""
 	Retrieves the current namespace as a record, excluding internal registers.
 	"""
-	return {k: v for k, v in task.values.items() if not re.fullmatch(r'-?[0123456789]+', k)}
+	return {k: v for k, v in registers.namespace(task.values).items() if not re.fullmatch(r'-?[0123456789]+', k)}
 
 std_namespace = funcdef(
 	namespace_none
@@ -254,7 +258,7 @@ def reduce_function_list(task, routine, sequence):
 		return None # Verify type signature
 	for right in sequence[1:]:
 		if instance.instructions:
-			caller = task.call()
+			caller = task.call(instance.frame())
 			instance(task, left, right)
 			left = task.run() # WARNING: Recursive runtime
 			task.restore(caller)
@@ -272,6 +276,7 @@ def return_none(task):
 		task.restore() # Restore namespace of calling routine
 	else:
 		task.path = 0 # End task
+	task.values[task.op.slot], task.types[task.op.slot] = None, aletheia.std_none # Different return address
 	return None # Returns null
 
 def return_any(task, sentinel):
@@ -281,7 +286,8 @@ def return_any(task, sentinel):
 		task.restore() # Restore namespace of calling routine
 	else:
 		task.path = 0 # End task
-	task.values[task.op.address] = sentinel # Different return address
+	task.values[task.op.slot] = sentinel # Different return address
+	task.types[task.op.slot] = aletheia.std_none if sentinel is None else task.properties
 	return sentinel
 
 std_return = funcdef(
@@ -291,7 +297,7 @@ std_return = funcdef(
 
 def reverse_slice(task, value):
 		
-	return slice(value.end, value.start, -value.step)
+	return value.reverse()
 
 std_reverse = funcdef(
 	reverse_slice
@@ -299,6 +305,8 @@ std_reverse = funcdef(
 
 def round_number(task, value):
 
+	if type(value) is float: # Rounds half away from 0, as real does
+		return float(floor(value + 0.5) if value >= 0 else -floor(0.5 - value))
 	return round(value)
 
 std_round = funcdef(
@@ -307,7 +315,7 @@ std_round = funcdef(
 
 def sign_number(task, value):
 
-	return real() if value == 0 else real(int(copysign(1, value)))
+	return machine(real() if value == 0 else real(int(copysign(1, value))), task.handler.flags)
 
 std_sign = funcdef(
 	sign_number
@@ -330,7 +338,7 @@ std_signature = funcdef(
 
 def split_string_string(task, string, separator):
 
-	return tuple(string.split(separator))
+	return tuple(str(string).split(str(separator)))
 
 std_split = funcdef(
 	split_string_string
@@ -338,11 +346,13 @@ std_split = funcdef(
 
 def sum_list(task, sequence):
 
+	if 'float' in task.handler.flags:
+		return float(sum(sequence))
 	return real(sum(sequence))
 
 def sum_slice(task, sequence):
 
-	return real(sum(sequence))
+	return sequence.sum()
 
 std_sum = funcdef(
 	sum_list,
@@ -30,7 +30,7 @@ class to_number:
 	def __number__(cls, value): return value
 
 	@classmethod
-	def __string__(cls, value): return real.read(value)
+	def __string__(cls, value): return real.read(str(value))
 
 	@classmethod
 	def __future__(cls, value): return real(value.pid)
@@ -53,16 +53,16 @@ class to_string:
 	def __boolean__(cls, value): return 'true' if value else 'false'
 
 	@classmethod
-	def __number__(cls, value): return str(value)
+	def __number__(cls, value): return repr(value).removesuffix('.0') if type(value) is float else str(value)
 
 	@classmethod
 	def __string__(cls, value): return value
 
 	@classmethod
-	def __list__(cls, value): return '[' + ', '.join([cast(i, 'string') for i in value]) + ']'
+	def __list__(cls, value): return '[' + ', '.join([str(cast(i, 'string')) for i in value]) + ']' # Elements may be ropes
 
 	@classmethod
-	def __record__(cls, value): return '[' + ', '.join([cast(k, 'string') + ': ' + cast(v, 'string') for k, v in value.items()]) + ']'
+	def __record__(cls, value): return '[' + ', '.join([str(cast(k, 'string')) + ': ' + str(cast(v, 'string')) for k, v in value.items()]) + ']'
 
 	@classmethod
 	def __slice__(cls, value): return '{0}:{1}:{2}'.format(value.start, value.stop, value.step)
@@ -4,6 +4,8 @@ Built-in operators.
 
 from ..datatypes import aletheia
 from ..datatypes.aletheia import funcdef, typedef
+from ..datatypes.mathos import machine
+from ..datatypes.mnemosyne import concat, record, substring, vector
 
 def u_add(_, x): return +x
 
@@ -27,9 +29,9 @@ def u_rsv(task, x):
 	
 	if not x.readable:
 		task.handler.error('READ', x)
-	task.message('resolve', x)
+	value = task.request('resolve', x)
 	task.properties = typedef(x.check)
-	return task.calls.recv()
+	return value
 
 def b_mul(_, x, y):	return x * y
 
@@ -76,7 +78,7 @@ std_ltn = funcdef(
 
 def n_rcv(task):
 	
-	return task.messages.recv()
+	return task.request('receive')
 
 def b_gtn(_, x, y):	return x > y
 
@@ -97,7 +99,7 @@ std_geq = funcdef(
 	b_geq
 )
 
-def b_sbs_string(_, x, y): return x in y
+def b_sbs_string(_, x, y): return str(x) in y
 
 def b_sbs_list(_, x, y): return x in y
 
@@ -154,11 +156,11 @@ std_ins = funcdef(
 	b_ins_type
 )
 
-def b_uni_string(_, x, y): return x + y
+def b_uni_string(_, x, y): return concat(x, y)
 
-def b_uni_list(_, x, y): return tuple(list(x) + list(y))
+def b_uni_list(_, x, y): return (x if isinstance(x, vector) else vector(x)).extend(y)
 
-def b_uni_record(_, x, y): return x | y
+def b_uni_record(_, x, y): return (x if isinstance(x, record) else record(x)).update(y)
 
 def b_uni_slice(_, x, y): return x | y
 
@@ -181,7 +183,7 @@ def b_idx_string_slice(task, sequence, index):
 
 	length = len(sequence)
 	if (-length <= index.start < length) and (-length <= index.end < length):
-		return ''.join(sequence[int(n)] for n in iter(index)) # Constructs slice of string using range
+		return substring(sequence, index.indices())
 	else:
 		return task.handler.error('INDX', index)
 
@@ -194,7 +196,7 @@ def b_idx_list_slice(task, sequence, index):
 	
 	length = len(sequence)
 	if (-length <= index.start < length) and (-length <= index.end < length):
-		return tuple(sequence[int(n)] for n in iter(index))
+		return tuple(map(sequence.__getitem__, index.indices()))
 	else:
 		return task.handler.error('INDX', index)
 
@@ -206,8 +208,8 @@ def b_idx_record_slice(task, sequence, index):
 
 	length = len(sequence)
 	if (-length <= index.start < length) and (-length <= index.end < length):
-		items = tuple(sequence.items())
-		return dict(items[int(n)] for n in iter(index))
+		keys = sequence.keys() if isinstance(sequence, record) else tuple(sequence)
+		return record((keys[i], sequence[keys[i]]) for i in index.indices())
 	else:
 		return task.handler.error('INDX', index)
 
@@ -220,7 +222,9 @@ def b_idx_slice_slice(task, sequence, index):
 	
 	length = len(sequence)
 	if (-length <= index.start < length) and (-length <= index.end < length):
-		return tuple(sequence[int(n)] for n in iter(index))
+		if (composed := sequence.compose(index)) is not None:
+			return tuple(composed)
+		return tuple(sequence[n] for n in index.indices())
 	else:
 		return task.handler.error('INDX', index)
 
@@ -289,7 +293,7 @@ def u_new(task, x):
 		return None
 	else:
 		task.properties = typedef(x)
-		return x.prototype
+		return machine(x.prototype, task.handler.flags)
 
 std_new = funcdef(
 	u_new
@@ -1,11 +1,12 @@
 from functools import reduce
+from itertools import count
 from multiprocessing import current_process
 from typing import Any, Self
 
 from .datatypes import aletheia, iris
 from .datatypes.aletheia import typedef
 from .datatypes.mathos import real, slice
-from .internal import presets
+from .internal import presets, registers, threaded, translator
 from .internal.instructions import instruction
 from .hemera import handler
 from .kadmos import parser
@@ -17,6 +18,8 @@ class task:
 	A task handles synchronous program execution and passes messages to and
 	from the supervisor.
 	"""
+	pids = count(3) # Task identifiers; 0 to 2 are the standard streams
+
 	def __init__( # God objects? What is she objecting to?
 		self,
 		handler: handler,
@@ -28,12 +31,15 @@ class task:
 		Task identifiers.
 		"""
 		self.name = instructions[0].label[0]
-		self.pid = id(self) # Guaranteed not to collide with other task PIDs in CPython
+		self.pid = next(task.pids) # Never reused, even across programs
 		"""
 		Namespace management.
+		The namespace is a register file of parallel lists indexed by slot.
 		"""
-		self.values = arche.stdvalues | namespace
-		self.types = {k: aletheia.infer(v) for k, v in self.values.items()} if types is None else arche.stdtypes | types
+		if types is None:
+			types = {k: aletheia.infer(v) for k, v in namespace.items()}
+		self.values = registers.frame(arche.stdvalues | namespace)
+		self.types = registers.frame(arche.stdtypes | types)
 		self.signature = [] # Current type signature
 		self.properties = None # Final type override
 		"""
@@ -48,6 +54,50 @@ class task:
 		self.caller = None # State of the calling routine
 		self.final = aletheia.std_any # Return type of routine
 		self.handler = handler # Error handler
+		"""
+		Suspension management.
+		"""
+		self.depth = 0 # Nesting of runtime loops
+		self.suspendable = True # Whether the task may release its worker
+		self.replies = [] # Reply to the request of a resumed task
+		self.stream = None # Supervisor message stream, given by the proxy
+
+	def __reduce__(self) -> tuple:
+		"""
+		The task is revived before its state is unpickled, so that a worker
+		process can empty its register table for a later program before the
+		instructions of the task are resolved.
+		"""
+		return self.revive, (registers.generation,), self.__getstate__()
+
+	@classmethod
+	def revive(
+		cls,
+		generation: int
+		) -> Self:
+
+		registers.reset(generation)
+		return cls.__new__(cls)
+
+	def __getstate__(self) -> dict:
+		"""
+		Slots are local to a process, so the namespace is pickled by name.
+		"""
+		state = self.__dict__.copy()
+		state['values'] = registers.namespace(self.values)
+		state['types'] = registers.namespace(self.types)
+		state['caller'] = None
+		state['stream'] = None # Worker processes inherit their stream
+		return state
+
+	def __setstate__(
+		self,
+		state: dict
+		) -> None:
+
+		self.__dict__.update(state)
+		self.values = registers.frame(state['values'])
+		self.types = registers.frame(state['types'])
 
 	def execute(self) -> Any:
 		"""
@@ -55,37 +105,163 @@ class task:
 		Executes flags and runtime loop.
 		"""
 		self.handler.debug_initial(self)
+		return self.proceed()
+
+	def resume(
+		self,
+		state: dict,
+		reply: Any
+		) -> Any:
+		"""
+		Target of task.pool.apply_async() for a suspended task.
+		Restores the parked state of the task and replays the instruction
+		that suspended it, which receives the reply instead of sending its
+		request again.
+		"""
+		self.unpark(state)
+		self.replies = [reply]
+		return self.proceed(self.caller)
+
+	def proceed(
+		self,
+		caller: dict | None = None
+		) -> Any:
+		"""
+		Executes the runtime loop until the task returns or suspends.
+		A suspended task is parked in the supervisor and returns no state.
+		"""
 		try:
-			value = self.run()
+			value = self.run(caller)
 			return self.handler.debug_final(self, value)
+		except iris.suspension as request:
+			self.path = self.path - 1 # Replay the current instruction
+			self.message('suspend', self.park(), request.instruction, request.args)
+			return None
 		except SystemExit:
 			return self.handler.debug_final(self, None)
 
-	def run(self) -> Any:
+	def run(
+		self,
+		caller: dict | None = None
+		) -> Any:
 		"""
 		Task runtime loop.
 		Performs dispatch and executes instructions.
 		"""
+		if 'generate' in self.handler.flags and 'task' not in self.handler.flags:
+			return self.generated(caller)
+		if 'threaded' in self.handler.flags and 'task' not in self.handler.flags:
+			return self.threaded(caller)
 		debug_task = 'task' in self.handler.flags # Debug runtime loop
-		self.caller = None # Reset caller
-		while self.path:
-			self.op = self.instructions[self.path]
-			if debug_task:
-				self.handler.debug_task(self)
-			self.path = self.path + 1
-			if self.op.address: # Skip labels
+		interns = task.interns
+		self.caller = caller # Reset caller
+		registers.extend(self.values, self.types)
+		self.depth = self.depth + 1
+		try:
+			while self.path:
+				self.op = op = self.instructions[self.path]
+				if debug_task:
+					self.handler.debug_task(self)
+				self.path = self.path + 1
+				if op.address: # Skip labels
+					try:
+						slots, values, types = op.slots, self.values, self.types
+						args = [values[i] for i in slots]
+						self.signature = [types[i] for i in slots]
+						if (name := op.name) in interns: # Internal instructions
+							value = interns[name](self, *args)
+						else:
+							value = values[op.routine](self, *args)
+					except KeyError as e:
+						self.handler.error('FIND', e.args[0])
+			else:
+				return value
+		finally:
+			self.depth = self.depth - 1
+
+	def threaded(
+		self,
+		caller: dict | None = None
+		) -> Any:
+		"""
+		Task runtime loop for the threaded-code backend.
+		Each instruction is compiled into a closure on first execution.
+		"""
+		interns = task.interns
+		self.caller = caller # Reset caller
+		registers.extend(self.values, self.types)
+		compile_step = threaded.compile_step
+		self.depth = self.depth + 1
+		try:
+			while self.path:
+				op = self.instructions[self.path]
+				self.path = self.path + 1
+				value = (op.step or compile_step(op, interns))(self)
+		except KeyError as e:
+			self.handler.error('FIND', e.args[0])
+		finally:
+			self.depth = self.depth - 1
+		return value
+
+	def generated(
+		self,
+		caller: dict | None = None
+		) -> Any:
+		"""
+		Task runtime loop for the generated backend.
+		Translated routines keep their state on the Python stack, which a
+		suspended task leaves behind. A resumed task continues the routines
+		that it suspended in on the threaded backend, from the paths saved in
+		its callers, and runs the routines that it calls afterwards as usual.
+		"""
+		self.caller = caller # Reset caller
+		registers.extend(self.values, self.types)
+		self.depth = self.depth + 1
+		try:
+			value = self.descend()
+			while self.path: # Returned to a caller of a resumed routine
+				value = self.descend()
+		finally:
+			self.depth = self.depth - 1
+		return value
+
+	def descend(self) -> Any:
+		"""
+		Executes the current routine until it returns to its caller.
+		Routines are translated to Python on their first call; routines that
+		cannot be translated, and events, fall back to the threaded backend.
+		A routine replaced by a tail call is run in the same loop.
+		"""
+		frame = self.caller
+		while True:
+			head = self.instructions[0]
+			if head.code is None:
 				try:
-					registers = self.op.args
-					args = [self.values[arg] for arg in registers]
-					self.signature = [self.types[arg] for arg in registers]
-					if (name := self.op.name) in task.interns: # Internal instructions
-						value = task.interns[name](self, *args)
-					else:
-						value = self.values[name](self, *args)
-				except KeyError as e:
-					self.handler.error('FIND', e.args[0])
-		else:
-			return value
+					generator = translator.translator(self.instructions, task.interns)
+					head.code = generator.load(task.descend)
+					self.handler.debug_source(generator.source)
+				except translator.untranslatable:
+					head.code = False
+			if not (head.code and self.path == 1):
+				break
+			value = head.code(self)
+			if self.caller is not frame or self.path != 1: # Returned to caller
+				return value
+		interns = task.interns
+		compile_step = threaded.compile_step
+		try:
+			while self.path:
+				op = self.instructions[self.path]
+				self.path = self.path + 1
+				value = (op.step or compile_step(op, interns))(self)
+				if self.caller is not frame:
+					if self.caller and self.caller['caller'] is frame: # Entered user routine
+						value = self.descend()
+					else: # Returned to caller
+						return value
+		except KeyError as e:
+			self.handler.error('FIND', e.args[0])
+		return value
 
 	def branch(
 		self,
@@ -95,7 +271,15 @@ class task:
 		) -> int:
 		"""
 		Universal branch function.
+		Jumps to the target resolved by the analyser; code that was not
+		analysed, such as meta-expressions, falls back to scanning for the
+		matching label.
 		"""
+		if (target := self.op.target) is not None:
+			path = self.path + target
+			if move:
+				self.path = path
+			return path
 		path = self.path
 		while True:
 			op, path = self.instructions[path], path + 1
@@ -109,14 +293,27 @@ class task:
 						self.path = path
 					return path
 
-	def call(self) -> dict:
+	def call(
+		self,
+		slots: tuple[int, ...] | None = None
+		) -> dict:
 		"""
 		Get the current mutable state of the task.
+		The frame is shared with the callee, so only the registers in slots,
+		which the callee can write, are saved with the state. If slots is
+		None, the whole frame is copied.
 		"""
+		values, types = self.values, self.types
+		if slots is None:
+			values, types, frame = values.copy(), types.copy(), None
+		else:
+			registers.extend(values, types)
+			frame = [(i, values[i], types[i]) for i in slots]
 		return {
 			'name': self.name,
-			'values': self.values.copy(),
-			'types': self.types.copy(),
+			'values': values,
+			'types': types,
+			'frame': frame,
 			'signature': self.signature,
 			'instructions': self.instructions,
 			'op': self.op,
@@ -132,7 +329,88 @@ class task:
 		"""
 		Restores the previous state of the task.
 		"""
-		self.__dict__.update(state if state else self.caller)
+		state = state if state else self.caller
+		if (frame := state['frame']) is not None: # Write back saved registers
+			values, types = state['values'], state['types']
+			for slot, value, known in frame:
+				values[slot], types[slot] = value, known
+		self.name = state['name']
+		self.values, self.types = state['values'], state['types']
+		self.signature = state['signature']
+		self.instructions, self.op, self.path = state['instructions'], state['op'], state['path']
+		self.caller, self.final = state['caller'], state['final']
+
+	def state(self) -> dict:
+		"""
+		Get the state of the task in a form that can leave the process.
+		"""
+		state = self.call()
+		state['values'] = registers.namespace(self.values)
+		state['types'] = registers.namespace(self.types)
+		state['caller'] = None
+		state['stream'] = None # Worker processes inherit their stream
+		return state
+
+	def park(self) -> dict:
+		"""
+		Get the state of a suspended task and of its callers in a form that
+		can leave the process. Frames shared between routines are converted
+		once, so that they remain shared when the task is resumed.
+		"""
+		namespaces, chain, state = {}, [], self.call(())
+		while state:
+			state = state.copy()
+			for key in ('values', 'types'):
+				frame = state[key]
+				if id(frame) not in namespaces:
+					namespaces[id(frame)] = registers.namespace(frame)
+				state[key] = namespaces[id(frame)]
+			if state['frame'] is not None:
+				state['frame'] = [(registers.names[i], value, known) for i, value, known in state['frame']]
+			chain.append(state)
+			state = state['caller']
+		for state, caller in zip(chain, chain[1:]):
+			state['caller'] = caller
+		chain[-1]['caller'] = None
+		return chain[0]
+
+	def unpark(
+		self,
+		state: dict
+		) -> None:
+		"""
+		Restores the state of a suspended task and of its callers.
+		"""
+		frames, top = {}, state
+		while state:
+			for key in ('values', 'types'):
+				namespace = state[key]
+				if id(namespace) not in frames:
+					frames[id(namespace)] = registers.frame(namespace)
+				state[key] = frames[id(namespace)]
+			if state['frame'] is not None:
+				state['frame'] = [(registers.slot(name), value, known) for name, value, known in state['frame']]
+			state = state['caller']
+		self.restore(top)
+
+	def request(
+		self,
+		instruction: str,
+		*args: tuple
+		) -> Any:
+		"""
+		Sends a request to the supervisor and gets its reply.
+		In the outermost runtime loop, the task suspends instead of waiting
+		on requests whose reply depends on other tasks or on input; the
+		supervisor answers the others at once.
+		A resumed task gets the reply that it was suspended for.
+		"""
+		if self.replies:
+			return self.replies.pop()
+		if self.depth == 1 and self.suspendable and instruction in ('read', 'receive', 'resolve'):
+			raise iris.suspension(instruction, args)
+		self.message(instruction, *args)
+		return self.calls.recv()
 
 	def prepare(
 		self,
@@ -143,6 +421,8 @@ class task:
 		Resets the task for the execution of an event.
 		"""
 		self.restore(namespace)
+		self.values = registers.frame(namespace['values'])
+		self.types = registers.frame(namespace['types'])
 		self.path, scope = 0, 0
 		while True:
 			op, self.path = self.instructions[self.path], self.path + 1
@@ -151,7 +431,9 @@ class task:
 				if scope == 1 and op.name == 'EVENT':
 					name = op.label[0]
 					break
-		self.values[name], self.types[name] = message, typedef(aletheia.std_any)
+		slot = registers.slot(name)
+		registers.extend(self.values, self.types)
+		self.values[slot], self.types[slot] = message, typedef(aletheia.std_any)
 
 	def use(self) -> None:
 		"""
@@ -164,16 +446,16 @@ class task:
 			if self.op.address: # Skip labels
 				try:
 					if (name := self.op.name) == '.type':
-						task.intern_type(self, *[self.values[arg] for arg in self.op.args])
+						task.intern_type(self, *[self.values[i] for i in self.op.slots])
 					elif name == '.event':
-						task.intern_event(self, *[self.values[arg] for arg in self.op.args])
+						task.intern_event(self, *[self.values[i] for i in self.op.slots])
 					elif name == '.function':
-						task.intern_function(self, *[self.values[arg] for arg in self.op.args])
+						task.intern_function(self, *[self.values[i] for i in self.op.slots])
 				except KeyError as e:
 					self.handler.error('FIND', e.args[0])
 		else:
 			self.path = 1
-			return arche.user_namespace(self.values)
+			return arche.user_namespace(registers.namespace(self.values))
 
 	def message(
 		self,
@@ -183,7 +465,7 @@ class task:
 		"""
 		Sends a message to the supervisor.
 		"""
-		current_process().stream.put(iris.message(self.pid, instruction, args))
+		(self.stream or current_process().stream).put(iris.message(self.pid, instruction, args))
 
 	"""
 	Preprocessor instructions.
@@ -199,6 +481,9 @@ class task:
 			self.path = self.path + 1
 			if self.op.name == 'BIND':
 				self.bind()
+		self.checks()
+		self.jumps()
+		self.tails()
 		self.path = 1
 		return self
 
@@ -206,7 +491,6 @@ class task:
 		"""
 		Evaluates type checking for name binding, removing instructions
 		if the type check is known to succeed.
-		Currently does not bother to remove unnecessary type checks.
 		"""
 		i, checks, addresses = self.path, [], []
 		while self.instructions[i].name != '.bind':
@@ -222,9 +506,241 @@ class task:
 				addresses.append(item.address)
 				checks.append(item)
 		self.instructions[i].args = addresses
+		self.instructions[i].resolve()
 		self.instructions[self.path - 1:i] = checks
 		self.path = self.path + len(checks)
 
+	def checks(self) -> None:
+		"""
+		Propagates known types through registers and removes type checks that
+		are known to succeed. Checks that remain are specialised to the
+		properties that are not already known.
+		Types are known for constants, built-in names, checked registers, and
+		the final types of built-in operators; registers that a block may
+		write lose their types at the labels of the block.
+		"""
+		instructions = self.instructions
+		if any(op.name in ('.meta', '.use') for op in instructions): # Namespace cannot be known
+			return self.handler.debug_checks(0, 0)
+		ends, stack = {}, []
+		for i, op in enumerate(instructions):
+			if not op.address:
+				if op.name == 'END':
+					ends[stack.pop()] = i
+				else:
+					stack.append(i)
+		defined = {op.address for op in instructions if op.name in ('.event', '.function', '.type')}
+		registers.extend(self.values, self.types)
+
+		def static(register: str) -> tuple[typedef | None, bool]: # Known type and nullability
+			if register in known:
+				return known[register], register in nullable
+			if register[0] == '-' or (register in presets.STDLIB_NAMES and register not in defined):
+				return self.types[registers.slot(register)], False
+			return None, False
+
+		def written(start: int, end: int) -> set[str]: # Registers whose types may change
+			names = set()
+			for op in instructions[start:end + 1]:
+				if op.address:
+					names.add(op.address)
+					if op.name in ('.bind', '.link'):
+						names.update(op.label)
+			return names
+
+		def write(register: str, known_type: typedef | None = None, null: bool = False) -> None:
+			known.pop(register, None)
+			elements.pop(register, None)
+			nullable.discard(register)
+			if known_type is not None:
+				known[register] = known_type
+				if null:
+					nullable.add(register)
+
+		known, nullable, elements = {}, set(), {} # Known types, nullable registers, known element types
+		saved, resets, removed = {}, {}, set()
+		specialised = 0
+		for i, op in enumerate(instructions[1:], 1):
+			if not op.address:
+				if i in saved: # End of definition
+					known, nullable, elements = saved.pop(i)
+				elif i in resets: # Else branch or end of block
+					known, nullable, elements = (item.copy() for item in resets[i])
+				elif op.name == 'START': # Start of block
+					end = ends[i]
+					while end + 1 < len(instructions) and instructions[end + 1].name == 'ELSE':
+						end = ends[end + 1]
+					names = written(i, end)
+					known = {k: v for k, v in known.items() if k not in names}
+					elements = {k: v for k, v in elements.items() if k not in names}
+					nullable = nullable - names
+					j = i
+					while True: # Labels that can be reached from anywhere in the block
+						resets[ends[j]] = (known, nullable, elements)
+						if ends[j] == end:
+							break
+						j = ends[j] + 1
+						resets[j] = (known, nullable, elements)
+					known, nullable, elements = known.copy(), nullable.copy(), elements.copy()
+				else:
+					known, nullable, elements = {}, set(), {}
+				continue
+			match op.name:
+				case '.check':
+					(source, name), address = op.args, op.address
+					check, known_type, null = None, *static(source)
+					if name in presets.STDLIB_NAMES and name not in defined:
+						check = self.values[registers.slot(name)]
+					if isinstance(check, typedef):
+						j = i + 1
+						while instructions[j].name == '.check':
+							j = j + 1
+						consumer = instructions[j]
+						exact = known_type is not None and not null # Type of value is known
+						success = check.types == aletheia.std_any.types or (exact and known_type < check)
+						if success and \
+						   (consumer.name in ('return', '.type') or (exact and known_type == check)) and \
+						   source not in {instructions[k].address for k in range(i + 1, j)}:
+							consumer.args = [source if arg == address else arg for arg in consumer.args]
+							consumer.resolve()
+							removed.add(i)
+							continue
+						elif success:
+							op.name = '.retype'
+						elif known_type is not None:
+							op.name = '.verify'
+							op.label = [item.name for item in check.types if item not in known_type.types]
+						if op.name != '.check':
+							op.resolve()
+							specialised = specialised + 1
+						write(address, check)
+					else:
+						write(address)
+				case '.bind':
+					for name, register in zip(op.label, op.args):
+						write(name, *static(register))
+						if register in elements:
+							elements[name] = elements[register]
+				case '.iterator':
+					element = elements.get(op.args[0])
+					known_type, null = static(op.args[0])
+					if element is None and known_type is not None and not null and (item := known_type['element']):
+						element = item.property
+					write(op.address, element)
+				case '.next':
+					write(op.address, *static(op.args[0]))
+				case '.range' | '.slice':
+					write(op.address)
+					elements[op.address] = aletheia.std_integer
+				case '.list':
+					signature = [static(register) for register in op.args]
+					if signature and all(known_type is not None and not null for known_type, null in signature):
+						element = reduce(typedef.__or__, [known_type for known_type, null in signature])
+						write(op.address, typedef(
+							aletheia.std_list,
+							aletheia.cls_element(element),
+							aletheia.cls_length(len(signature))
+						))
+					else:
+						write(op.address)
+				case '.event' | '.function' | '.type': # Definitions are analysed without known types
+					write(op.address)
+					end = ends[i + 1] if op.name != '.event' else ends[ends[i + 1] + 1]
+					saved[end] = (known, nullable, elements)
+					known, nullable, elements = {}, set(), {}
+				case '.link':
+					for name in op.label:
+						write(name)
+				case name if name in task.interns:
+					write(op.address)
+				case name if not name.isidentifier() and name not in defined: # Built-in operators
+					signature = [static(register) for register in op.args]
+					routine, instance = self.values[op.routine], None
+					if isinstance(routine, aletheia.funcdef) and all(known_type is not None and not null for known_type, null in signature):
+						instance = routine.resolve([known_type for known_type, null in signature])
+					if instance is not None and not instance.instructions and instance.final.types:
+						write(op.address, instance.final, True) # Built-ins return null on failure
+					else:
+						write(op.address)
+				case _:
+					write(op.address)
+		if removed:
+			self.instructions[:] = [op for i, op in enumerate(instructions) if i not in removed]
+		self.handler.debug_checks(len(removed), specialised)
+
+	def jumps(self) -> None:
+		"""
+		Resolves the targets of branches, loops, breaks, and definitions
+		from the block structure of the instructions, so that control flow
+		does not need to scan for labels at runtime.
+		Targets are relative because routines execute slices of the
+		instructions of their module.
+		"""
+		instructions = self.instructions
+		heads, ends, stack = [], {}, [] # Innermost block of each instruction and end of each block
+		for i, op in enumerate(instructions):
+			heads.append(stack[-1] if stack else None)
+			if not op.address:
+				if op.name == 'END':
+					ends[stack.pop()] = i
+				elif op.name in ('START', 'ELSE', 'EVENT'):
+					stack.append(i)
+
+		def chain(path: int) -> int: # Skips else branches
+			while path < len(instructions) and instructions[path].name == 'ELSE':
+				path = ends[path] + 1
+			return path
+
+		def loop(head: int) -> int: # Innermost enclosing loop
+			while instructions[ends[head] - 1].name != '.loop':
+				head = heads[head]
+			return head
+
+		for i, op in enumerate(instructions):
+			if not op.address:
+				continue
+			match op.name:
+				case 'if' if op.args: # Conditional branch
+					path = ends[heads[i]] + 1
+				case 'if' | '.next': # Unconditional branch and loop exit
+					path = chain(ends[heads[i]] + 1)
+				case '.loop' | '.continue':
+					path = loop(heads[i])
+				case '.break':
+					path = ends[loop(heads[i])]
+				case '.function' | '.type':
+					path = ends[i + 1] + 1
+				case '.event':
+					path = ends[ends[i + 1] + 1] + 1
+				case _:
+					continue
+			op.target = path - i - 1
+
+	def tails(self) -> None:
+		"""
+		Marks the calls in tail position, whose result is returned without
+		being used except by the type check of the return, so that the call
+		can replace the frame of the routine.
+		"""
+		instructions = self.instructions
+		for i, op in enumerate(instructions):
+			if not op.address or op.name in task.interns or op.name in ('if', 'return'):
+				continue
+			register, j = op.address, i + 1
+			while True: # Follow the result to the return
+				step = instructions[j]
+				if step.name == 'END' and not step.address:
+					j = j + 1
+				elif step.name == 'if' and not step.args and step.target is not None: # Skips else branches
+					j = j + step.target + 1
+				elif step.name == '.bind' and step.args == [register] and step.label[0].isdigit(): # Conditional expression
+					register, j = step.label[0], j + 1
+				elif step.name in ('.check', '.retype', '.verify') and step.args[0] == register and instructions[j + 1].name == 'return':
+					register, j = step.address, j + 1
+				else:
+					break
+			op.tail = step.name == 'return' and step.args == [register]
+
 	"""
 	Internal instructions.
 	"""
@@ -234,9 +750,11 @@ class task:
 		*args: tuple
 		) -> None:
 
-		for i, name in enumerate(self.op.label):
-			self.values[name] = args[i]
-			self.types[name] = self.signature[i]
+		for i, slot in enumerate(self.op.labels):
+			if type(known := self.signature[i]) is registers.unbound:
+				raise KeyError(known.name)
+			self.values[slot] = args[i]
+			self.types[slot] = known
 
 	def intern_break(
 		self,
@@ -244,9 +762,12 @@ class task:
 		index: Any
 		) -> None:
 		
-		op = self.instructions[self.path]
-		iterator, index = self.op.args # Registers for the iterator and loop index
+		iterator, index = self.op.slots # Registers for the iterator and loop index
 		self.values[iterator], self.values[index] = None, None # Sanitise registers
+		if (target := self.op.target) is not None:
+			self.path = self.path + target
+			return
+		op = self.instructions[self.path]
 		while not op.name == '.loop':
 			op, self.path = self.instructions[self.path], self.path + 1
 
@@ -258,7 +779,7 @@ class task:
 		"""
 		Type check wrapper for when a failed type check requires an error condition.
 		"""
-		address = self.op.address
+		address = self.op.slot
 		self.values[address] = value if check(self, value, write = False) else self.handler.error('TYPE', check, value)
 		self.types[address] = typedef(check)
 		return value
@@ -285,13 +806,13 @@ class task:
 		*types: tuple[typedef, ...]
 		) -> None:
 		
-		name = self.op.address
-		params = self.op.label
+		name, params = self.op.slot, self.op.label
 		start = self.path
-		end = self.branch(0, True, True)
+		if self.op.target is None:
+			self.branch(0, True, True)
 		end = self.branch(1, True, True)
 		definition = aletheia.event_method(self.instructions[start:end], list(params), list(types))
-		if name in self.values and self.types[name] < aletheia.std_event:
+		if type(self.values[name]) is not registers.unbound and self.types[name] < aletheia.std_event:
 			self.values[name].extend(definition)
 		else:
 			routine = aletheia.eventdef()
@@ -304,11 +825,10 @@ class task:
 		*types: tuple[typedef, ...]
 		) -> None:
 		
-		name = self.op.address
-		params = self.op.label
+		name, params = self.op.slot, self.op.label
 		start, end = self.path, self.branch(0, True, True)
 		definition = aletheia.function_method(self.instructions[start:end], list(params), list(types), user = True)
-		if name in self.values and self.types[name] < aletheia.std_function:
+		if type(self.values[name]) is not registers.unbound and self.types[name] < aletheia.std_function:
 			self.values[name].extend(definition)
 		else:
 			routine = aletheia.funcdef()
@@ -322,7 +842,7 @@ class task:
 		*args: tuple
 		) -> None:
 
-		address, signature, arity = self.op.address, self.signature[1:], self.op.arity - 1
+		address, signature, arity = self.op.slot, self.signature[1:], self.op.arity - 1
 		instance = routine.true if signature else routine.false
 		while instance: # Traverse tree; terminates upon reaching leaf node
 			instance = instance.true if instance.index < arity and instance.check(signature) else instance.false
@@ -331,18 +851,17 @@ class task:
 		for i, item in enumerate(signature): # Verify type signature
 			if item > instance.signature[i]:
 				self.handler.error('DISP', self.op.args[0], signature)
-		values = arche.intern_namespace(self.values) | dict(zip(instance.params, args))
-		types = arche.intern_namespace(self.types) | dict(zip(instance.params, instance.signature))
-		self.message('future', instance, values, types)
+		values = arche.intern_namespace(registers.namespace(self.values)) | dict(zip(instance.params, args))
+		types = arche.intern_namespace(registers.namespace(self.types)) | dict(zip(instance.params, instance.signature))
+		self.values[address] = self.request('future', instance, values, types)
 		self.types[address] = typedef(aletheia.std_future)
-		self.values[address] = self.calls.recv()
 
 	def intern_iterator(
 		self,
 		sequence: Any
 		) -> None:
 	
-		address, element = self.op.address, self.signature[0]['element']
+		address, element = self.op.slot, self.signature[0]['element']
 		self.values[address] = iter(sequence)
 		self.types[address] = element.property if element else aletheia.infer(sequence)
 
@@ -350,18 +869,17 @@ class task:
 		self,
 		) -> None:
 	
-		for name in self.op.label: # Asynchronous I/O
-			self.message('link', name + '.sph')
-		for name in self.op.label:
-			self.values[name] = self.calls.recv()
-			self.types[name] = typedef(aletheia.std_future)
+		references = self.request('link', *[name + '.sph' for name in self.op.label])
+		for slot, reference in zip(self.op.labels, references):
+			self.values[slot] = reference
+			self.types[slot] = typedef(aletheia.std_future)
 	
 	def intern_list(
 		self,
 		*args: tuple
 		) -> None:
 
-		address = self.op.address
+		address = self.op.slot
 		element = reduce(typedef.__or__, self.signature)
 		length = len(args)
 		self.values[address] = args
@@ -375,6 +893,9 @@ class task:
 		self
 		) -> None:
 
+		if (target := self.op.target) is not None:
+			self.path = self.path + target
+			return
 		scope = 1
 		while True:
 			self.path = self.path - 1
@@ -391,14 +912,11 @@ class task:
 		string: str
 		) -> None:
 
-		instructions, namespace = parser(self.handler, '<meta>').parse(string)
-		if not instructions[-2].args: # Expression return
-			instructions[-2].args = ['1'] if instructions[1:-2] else ['-2'] # Register of the head node
-			instructions[-2].arity = 1
-		self.caller = self.call()
+		instructions, namespace, types = parser(self.handler, '<meta>').parse(str(string), expression = True) # Flatten ropes for the parser
+		self.caller = self.call(registers.writes(instructions, *namespace))
 		self.final = aletheia.std_any # Cannot guarantee type of meta-expression
-		self.values = self.values | namespace
-		self.types = self.types | {k: aletheia.infer(v) for k, v in namespace.items()}
+		registers.update(self.values, namespace)
+		registers.update(self.types, types)
 		self.instructions = instructions
 		self.path = 1
 
@@ -407,12 +925,12 @@ class task:
 		iterator: Any,
 		) -> None:
 	
-		address = self.op.address
+		address = self.op.slot
 		try:
 			self.values[address] = next(iterator)
 			self.types[address] = self.signature[0]
 		except StopIteration:
-			self.values[self.op.args[0]] = None # Sanitise register
+			self.values[self.op.slots[0]] = None # Sanitise register
 			self.branch(1, False, True)
 
 	def intern_range(
@@ -422,7 +940,7 @@ class task:
 		z: real
 		) -> None:
 
-		address = self.op.address
+		address = self.op.slot
 		value = tuple(slice(x, y, z))
 		self.values[address] = value
 		self.types[address] = typedef(
@@ -436,25 +954,41 @@ class task:
 		*args: tuple
 		) -> None:
 		
-		address = self.op.address
+		address = self.op.slot
 		element = reduce(typedef.__or__, self.signature)
 		length = len(args)
-		self.values[address] = dict(zip((self.values[arg] for arg in self.op.label), args))
+		self.values[address] = dict(zip((self.values[i] for i in self.op.labels), args))
 		self.types[address] = typedef(
 			aletheia.std_record,
 			aletheia.cls_element(element),
 			aletheia.cls_length(length)
 		)
 
+	def intern_retype(
+		self,
+		value: Any,
+		check: typedef
+		) -> None:
+		"""
+		Type check that is known to succeed.
+		"""
+		address = self.op.slot
+		self.values[address] = value
+		self.types[address] = typedef(check)
+		return value
+
 	def intern_skip(
 		self,
 		*sentinel: Any
 		) -> None:
 
-		address = self.op.address
-		path, self.path = self.path, 0
-		while self.path < path:
-			self.branch(0, True, True)
+		address = self.op.slot
+		if (target := self.op.target) is not None:
+			self.path = self.path + target
+		else:
+			path, self.path = self.path, 0
+			while self.path < path:
+				self.branch(0, True, True)
 		self.values[address] = sentinel[0] if sentinel else None
 		self.types[address] = self.signature[0]
 
@@ -465,7 +999,7 @@ class task:
 		z: real
 		) -> None:
 
-		address = self.op.address
+		address = self.op.slot
 		value = slice(x, y, z)
 		self.values[address] = value
 		self.types[address] = typedef(
@@ -480,7 +1014,7 @@ class task:
 		prototype: Any = None
 		) -> None:
 	
-		address = self.op.address
+		address = self.op.slot
 		start, end = self.path, self.branch(0, True, True)
 		instructions = self.instructions[start:end]
 		method = aletheia.type_property(self.op.label[0], instructions)
@@ -492,17 +1026,33 @@ class task:
 		) -> None:
 
 		if self.op.address == '0': # Use
-			for name in self.op.label: # Asynchronous I/O
-				self.message('use', name)
-			for name in self.op.label:
-				namespace = self.calls.recv()
-				self.values = self.values | namespace
-				self.types = self.types | {k: aletheia.infer(v) for k, v in namespace.items()}
+			for namespace in self.request('use', *self.op.label):
+				registers.update(self.values, namespace)
+				registers.update(self.types, {k: aletheia.infer(v) for k, v in namespace.items()})
 		else: # Use from
-			self.message('use', self.op.address)
-			namespace = {k: v for k, v in self.calls.recv().items() if k in self.op.label}
-			self.values = self.values | namespace
-			self.types = self.types | {k: aletheia.infer(v) for k, v in namespace.items()}
+			namespace, = self.request('use', self.op.address)
+			namespace = {k: v for k, v in namespace.items() if k in self.op.label}
+			registers.update(self.values, namespace)
+			registers.update(self.types, {k: aletheia.infer(v) for k, v in namespace.items()})
+
+	def intern_verify(
+		self,
+		value: Any,
+		check: typedef
+		) -> None:
+		"""
+		Type check of only the properties that are not already known.
+		Null values do not have their known type, so they are checked fully.
+		"""
+		if value is None:
+			return task.intern_check(self, value, check)
+		address, names = self.op.slot, self.op.label
+		for item in check.types:
+			if item.name in names and not item.check(self, value, None):
+				self.handler.error('TYPE', check, value)
+		self.values[address] = value
+		self.types[address] = typedef(check)
+		return value
 
 	interns = {
 		'.bind': intern_bind,
@@ -521,8 +1071,10 @@ class task:
 		'.next': intern_next,
 		'.range': intern_range,
 		'.record': intern_record,
+		'.retype': intern_retype,
 		'.skip': intern_skip,
 		'.slice': intern_slice,
 		'.type': intern_type,
-		'.use': intern_use
+		'.use': intern_use,
+		'.verify': intern_verify
 	}
\ No newline at end of file